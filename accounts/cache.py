@@ -0,0 +1,156 @@
+"""
+Response cache for public GET endpoints.
+
+Entries are keyed on the request path, its query parameters and the current
+generation of every namespace the response depends on ("books", "authors",
+...). Model save/delete signals bump generations (see accounts.signals), so
+stale entries are simply never read again and expire on their own.
+
+Generations only work if every worker sees the same cache: with the
+per-process LocMemCache a write would invalidate one worker's entries and
+leave the others serving stale data, so cached_api_response() then does
+nothing (see cache_is_shared()).
+
+Cold keys are built by a single worker: the first one takes a short lock,
+the others wait for its result instead of all hitting the database.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.response import Response
+
+from .models import AppUser, Audiobook, Author, Book, BookReview, Category, Image, Poem, PoemReview, ShortStory, Video
+from .pagination import PAGINATION_HEADERS
+
+LOCK_TIMEOUT = 30  # Seconds a builder may hold the lock before it is considered dead
+LOCK_WAIT = 5  # Seconds other workers wait for the builder before computing themselves
+LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+# Model -> cache namespaces whose responses include its data
+CACHE_NAMESPACES = {
+    Category: ("categories",),
+    Author: ("authors",),
+    AppUser: ("users",),
+    Book: ("books",),
+    BookReview: ("books",),
+    Poem: ("poems",),
+    PoemReview: ("poems",),
+    ShortStory: ("stories",),
+    Audiobook: ("audiobooks",),
+    Video: ("videos",),
+    Image: ("images",),
+}
+
+
+def cache_is_shared():
+    """Whether all worker processes see the same default cache (anything but LocMemCache)"""
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def _generation_key(namespace):
+    return f"cache:gen:{namespace}"
+
+
+def get_generations(namespaces):
+    """Return the current generation of each namespace, initializing missing ones"""
+    keys = {namespace: _generation_key(namespace) for namespace in namespaces}
+    found = cache.get_many(keys.values())
+    generations = []
+    for namespace, key in keys.items():
+        generation = found.get(key)
+        if generation is None:
+            # Start from the clock, not 1, so an evicted counter never reuses an old generation
+            cache.add(key, int(time.time() * 1000), None)
+            generation = cache.get(key)
+        generations.append(generation)
+    return generations
+
+
+def bump_generation(*namespaces):
+    """Invalidate every cached entry that depends on any of the namespaces"""
+    for namespace in namespaces:
+        key = _generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), None)
+
+
+def get_or_build(key, builder, timeout):
+    """
+    Return the cached value for key, building it at most once across workers.
+
+    builder() returns the value to cache; None means "do not cache".
+    """
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = builder()
+            if value is not None:
+                cache.set(key, value, timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    # Another worker is building this key: wait for its result
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if cache.get(lock_key) is None:
+            break
+    return builder()
+
+
+def _response_key(request, namespaces):
+    query = sorted((name, sorted(values)) for name, values in request.query_params.lists())
+    generations = get_generations(namespaces)
+    raw = f"{request.path}|{query}|{generations}"
+    return "api2:" + hashlib.md5(raw.encode()).hexdigest()
+
+
+def cached_api_response(*namespaces, timeout=None):
+    """
+    Cache the data (and pagination headers) of successful responses of an APIView GET method.
+
+    Usage:
+        @cached_api_response("books", "authors")
+        def get(self, request): ...
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if not cache_is_shared():
+                return method(view, request, *args, **kwargs)
+            built = {}
+
+            def build():
+                response = method(view, request, *args, **kwargs)
+                built['response'] = response
+                if response.status_code != 200:
+                    return None
+                headers = {name: response[name] for name in PAGINATION_HEADERS if response.has_header(name)}
+                return response.data, headers
+
+            key = _response_key(request, namespaces)
+            cached = get_or_build(key, build, timeout or settings.API_CACHE_TIMEOUT)
+            if 'response' in built:
+                return built['response']
+            if cached is None:
+                return method(view, request, *args, **kwargs)
+            data, headers = cached
+            return Response(data, headers=headers)
+        return wrapper
+    return decorator
@@ -0,0 +1,125 @@
+"""
+Denormalized like_count / comment_count columns on the content models, and the
+stored rating aggregates on Book and Poem.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import CACHE_NAMESPACES, bump_generation
+from .models import CONTENT_MODELS, RATING_STAR_FIELDS, RATING_STARS, Like, Comment
+
+# Counter column -> generic model it counts
+COUNTER_SOURCES = {
+    'like_count': Like,
+    'comment_count': Comment,
+}
+
+# Rated content type -> related name of its review rows
+RATING_SOURCES = {
+    'book': 'book_reviews',
+    'poem': 'poem_reviews',
+}
+
+
+def adjust_counter(content_type, content_id, field, delta):
+    """Atomically add delta to a content row's counter (never below zero); unknown types are ignored"""
+    model = CONTENT_MODELS.get(content_type)
+    if model is None:
+        return
+    if model.objects.filter(pk=content_id).update(**{field: Greatest(F(field) + delta, Value(0))}):
+        # .update() sends no signals: cached lists and details still show the old counter
+        transaction.on_commit(lambda: bump_generation(*CACHE_NAMESPACES[model]))
+
+
+def reconcile_counters(content_types=None):
+    """
+    Recompute counters that drifted from the Like/Comment tables.
+
+    Returns {(content_type, field): number of rows fixed}.
+    """
+    fixed = {}
+    for content_type in content_types or CONTENT_MODELS:
+        model = CONTENT_MODELS[content_type]
+        for field, source in COUNTER_SOURCES.items():
+            actual = Coalesce(
+                Subquery(
+                    source.objects.filter(content_type=content_type, content_id=OuterRef('pk'))
+                    .order_by()
+                    .values('content_id')
+                    .annotate(total=Count('id'))
+                    .values('total')
+                ),
+                0,
+            )
+            stale_ids = list(
+                model.objects.annotate(actual=actual)
+                .exclude(**{field: F('actual')})
+                .values_list('pk', flat=True)
+            )
+            fixed[(content_type, field)] = (
+                model.objects.filter(pk__in=stale_ids).update(**{field: actual}) if stale_ids else 0
+            )
+    return fixed
+
+
+def _rating_values(rating_sum, rating_count, stars):
+    return {
+        'rating_sum': rating_sum,
+        'rating_count': rating_count,
+        'average_rating': round(rating_sum / rating_count, 1) if rating_count else 0,
+        **dict(zip(RATING_STAR_FIELDS, stars)),
+    }
+
+
+def apply_rating_change(content, old_rating=None, new_rating=None):
+    """
+    Fold one review insert (old_rating=None), edit, or delete (new_rating=None)
+    into the stored rating columns of a Book or Poem.
+
+    content must be locked with select_for_update() in the caller's transaction.
+    """
+    stars = [
+        max(getattr(content, field) + (star == new_rating) - (star == old_rating), 0)
+        for star, field in zip(RATING_STARS, RATING_STAR_FIELDS)
+    ]
+    values = _rating_values(
+        content.rating_sum + (new_rating or 0) - (old_rating or 0),
+        content.rating_count + (new_rating is not None) - (old_rating is not None),
+        stars,
+    )
+    type(content).objects.filter(pk=content.pk).update(**values)
+    for field, value in values.items():
+        setattr(content, field, value)
+
+
+def reconcile_ratings(content_types=None):
+    """
+    Recompute rating columns that drifted from the review tables (e.g. reviews
+    removed by a cascading user delete).
+
+    Returns {(content_type, 'rating'): number of rows fixed}.
+    """
+    fixed = {}
+    for content_type in content_types or RATING_SOURCES:
+        if content_type not in RATING_SOURCES:
+            continue
+        model = CONTENT_MODELS[content_type]
+        stored = ('rating_sum', 'rating_count', *RATING_STAR_FIELDS)
+        actual = ('total', 'num_reviews', *(f'num_rating_{star}' for star in RATING_STARS))
+        rows = (
+            model.objects.order_by()
+            .with_rating_stats()
+            .annotate(total=Coalesce(Sum(f'{RATING_SOURCES[content_type]}__rating'), 0))
+            .values_list('pk', *stored, *actual)
+        )
+        width = len(stored)
+        stale = [
+            (row[0], row[1 + width:])
+            for row in rows
+            if row[1:1 + width] != row[1 + width:]
+        ]
+        for pk, (total, count, *stars) in stale:
+            model.objects.filter(pk=pk).update(**_rating_values(total, count, stars))
+        fixed[(content_type, 'rating')] = len(stale)
+    return fixed
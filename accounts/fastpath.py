@@ -0,0 +1,171 @@
+"""
+Read-only fast path for list GETs.
+
+Builds response dicts straight from .values() rows instead of running a
+ModelSerializer per row. Column fields are converted with the serializer's
+own field objects where DRF does real work (datetimes, decimals); derived
+fields (author fallbacks, choice labels, ...) are precompiled functions of
+the row. Output matches BookSerializer / PoemSerializer field for field,
+including the fields DRF drops when a nested source like author.name is
+missing (see accounts.tests.FastPathConformanceTests).
+"""
+from datetime import datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .models import RATING_STARS, Book, Poem
+from .serializers import BookSerializer, PoemSerializer, serializer_fields
+
+_SKIP = object()  # Derived value DRF would leave out of the response
+
+# Field types whose representation differs from the database value
+_CONVERTED_FIELDS = (
+    serializers.DateField,
+    serializers.TimeField,
+    serializers.DecimalField,
+    serializers.DurationField,
+)
+
+
+def _datetime_converter(field, tz):
+    """DateTimeField.to_representation with the timezone lookup hoisted out of the row loop"""
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT) != ISO_8601 or tz is None or hasattr(field, 'timezone'):
+        return field.to_representation
+
+    def convert(value):
+        if not isinstance(value, datetime) or timezone.is_naive(value):
+            return field.to_representation(value)
+        text = value.astimezone(tz).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return convert
+
+
+def _converter(field, tz):
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field, tz)
+    if isinstance(field, _CONVERTED_FIELDS):
+        return field.to_representation
+    if isinstance(field, serializers.BooleanField):
+        return bool
+    if isinstance(field, serializers.IntegerField):
+        return int
+    if isinstance(field, serializers.FloatField):
+        return float
+    return None
+
+
+def _nested(column):
+    """A source like author.name: DRF skips the field when the relation is missing"""
+    def derive(row):
+        value = row[column]
+        return _SKIP if value is None and row[column.split('__')[0]] is None else value
+    return derive
+
+
+def _choice_label(labels, column):
+    return lambda row: labels.get(row[column], row[column])
+
+
+def _rating_distribution(row):
+    return {str(star): row[f'rating_{star}'] for star in RATING_STARS}
+
+
+def _poem_author_name(row):
+    if row['author'] is not None:
+        return row['author__name']
+    if row['user'] is not None:
+        return row['user__username']
+    return "Unknown"
+
+
+def _poem_author_photo(row):
+    if row['author'] is not None:
+        return row['author__photo_url']
+    if row['user'] is not None:
+        return row['user__profile_photo']
+    return None
+
+
+# Serializer -> {derived field: (columns it reads, row -> value)}
+DERIVED_FIELDS = {
+    BookSerializer: {
+        'author_name': (('author', 'author__name'), _nested('author__name')),
+        'category_name': (('category', 'category__name'), _nested('category__name')),
+        'genre_display': (('genre',), _choice_label(Book.GENRE_LABELS, 'genre')),
+        'review_count': (('rating_count',), lambda row: row['rating_count']),
+        'rating_distribution': (tuple(f'rating_{star}' for star in RATING_STARS), _rating_distribution),
+    },
+    PoemSerializer: {
+        'author_name': (('author', 'author__name', 'user', 'user__username'), _poem_author_name),
+        'author_photo': (('author', 'author__photo_url', 'user', 'user__profile_photo'), _poem_author_photo),
+        'category_display': (('category',), _choice_label(Poem.CATEGORY_LABELS, 'category')),
+        'genre_display': (('genre',), _choice_label(Poem.GENRE_LABELS, 'genre')),
+        'review_count': (('rating_count',), lambda row: row['rating_count']),
+        'rating_distribution': (tuple(f'rating_{star}' for star in RATING_STARS), _rating_distribution),
+        'user_name': (('user', 'user__username'), _nested('user__username')),
+        'is_user_poem': (('user',), lambda row: row['user'] is not None),
+    },
+}
+
+
+def _plan_fields(fields):
+    """Cache key of a field selection: field order does not change the plan"""
+    return frozenset(fields) if fields else None
+
+
+# Bounded: ?fields= selections come from clients
+@lru_cache(maxsize=256)
+def _plan(serializer_class, fields, tz=None):
+    """(columns to select, [(name, column, converter, derive)]) for a field selection, built once per timezone"""
+    derived = DERIVED_FIELDS[serializer_class]
+    declared = serializer_class().fields
+    columns = []
+    steps = []
+    # Serializer declaration order, whatever order the selection came in
+    for name in serializer_fields(serializer_class):
+        if fields and name not in fields:
+            continue
+        if name in derived:
+            sources, derive = derived[name]
+            columns.extend(sources)
+            steps.append((name, None, None, derive))
+        else:
+            field = declared[name]
+            columns.append(field.source)
+            steps.append((name, field.source, _converter(field, tz), None))
+    return tuple(dict.fromkeys(columns)), steps
+
+
+def values_queryset(queryset, serializer_class, fields=None):
+    """Narrow a model queryset to the .values() columns needed to render `fields` (and to paginate it)"""
+    columns, _ = _plan(serializer_class, _plan_fields(fields))
+    ordering = [
+        field.lstrip('-') for field in queryset.query.order_by or queryset.model._meta.ordering
+        if isinstance(field, str)
+    ]
+    return queryset.values(*dict.fromkeys([*columns, *ordering, 'pk']))
+
+
+def render_rows(rows, serializer_class, fields=None):
+    """Response dicts for .values() rows, identical to serializer_class(objs, many=True, fields=fields).data"""
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    _, steps = _plan(serializer_class, _plan_fields(fields), tz)
+    data = []
+    for row in rows:
+        item = {}
+        for name, column, convert, derive in steps:
+            if derive is not None:
+                value = derive(row)
+                if value is _SKIP:
+                    continue
+            else:
+                value = row[column]
+                if value is not None and convert is not None:
+                    value = convert(value)
+            item[name] = value
+        data.append(item)
+    return data
@@ -0,0 +1,610 @@
+"""
+Unified feed helpers used by UnifiedFeedView.
+"""
+import base64
+import heapq
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .cache import bump_generation, cache_is_shared, get_generations
+from .models import CONTENT_MODELS, Like, Comment, FeedItem
+from .personalization import find_user_bookmarks, find_user_likes, pairs_filter
+
+
+FEED_TYPES = ('book', 'poem', 'story', 'audiobook', 'video', 'image')
+
+# Columns every feed row carries, in response order
+FEED_COLUMNS = ('type', 'id', 'title', 'author_name', 'author_photo', 'cover_image', 'description', 'content', 'created_at')
+
+STORY_EXCERPT_LENGTH = 2000
+
+# One UNION ALL branch per content type: table alias, SELECT/FROM and visibility conditions.
+# Rows are ordered by (created_at DESC, type DESC, id DESC) so every row has a unique position.
+FEED_BRANCHES = {
+    'book': {
+        'alias': 'b',
+        'select': """
+            SELECT 'book' as type, b.id as id, b.title,
+                   COALESCE(a.name, 'Unknown') as author_name,
+                   a.photo_url as author_photo,
+                   b.cover_image_url as cover_image,
+                   b.description,
+                   CAST(NULL AS TEXT) as content,
+                   b.created_at as created_at,
+                   b.like_count as like_count,
+                   b.comment_count as comment_count
+            FROM accounts_book b
+            LEFT JOIN accounts_author a ON b.author_id = a.id""",
+        'table': 'accounts_book',
+        'where': ("is_active IS TRUE",),
+    },
+    'poem': {
+        'alias': 'p',
+        'select': """
+            SELECT 'poem' as type, p.id as id, p.title,
+                   COALESCE(a.name, u.username, 'Unknown') as author_name,
+                   COALESCE(a.photo_url, u.profile_photo) as author_photo,
+                   p.background_image_url as cover_image,
+                   p.description,
+                   p.content,
+                   p.created_at as created_at,
+                   p.like_count as like_count,
+                   p.comment_count as comment_count
+            FROM accounts_poem p
+            LEFT JOIN accounts_author a ON p.author_id = a.id
+            LEFT JOIN accounts_appuser u ON p.user_id = u.id""",
+        'table': 'accounts_poem',
+        'where': ("is_active IS TRUE", "is_approved IS TRUE"),
+    },
+    'story': {
+        'alias': 's',
+        'select': """
+            SELECT 'story' as type, s.id as id, s.title,
+                   COALESCE(a.name, u.username, 'Unknown') as author_name,
+                   COALESCE(a.photo_url, u.profile_photo) as author_photo,
+                   s.cover_image_url as cover_image,
+                   CAST(NULL AS TEXT) as description,
+                   SUBSTR(s.content, 1, 2000) as content,
+                   s.created_at as created_at,
+                   s.like_count as like_count,
+                   s.comment_count as comment_count
+            FROM accounts_shortstory s
+            LEFT JOIN accounts_author a ON s.author_id = a.id
+            LEFT JOIN accounts_appuser u ON s.user_id = u.id""",
+        'table': 'accounts_shortstory',
+        'where': ("is_active IS TRUE", "is_approved IS TRUE"),
+    },
+    'audiobook': {
+        'alias': 'ab',
+        'select': """
+            SELECT 'audiobook' as type, ab.id as id, ab.title,
+                   COALESCE(a.name, 'Unknown') as author_name,
+                   a.photo_url as author_photo,
+                   ab.cover_image_url as cover_image,
+                   ab.description,
+                   CAST(NULL AS TEXT) as content,
+                   ab.created_at as created_at,
+                   ab.like_count as like_count,
+                   ab.comment_count as comment_count
+            FROM accounts_audiobook ab
+            LEFT JOIN accounts_author a ON ab.author_id = a.id""",
+        'table': 'accounts_audiobook',
+        'where': ("is_active IS TRUE",),
+    },
+    'video': {
+        'alias': 'v',
+        'select': """
+            SELECT 'video' as type, v.id as id, v.title,
+                   COALESCE(a.name, 'Unknown') as author_name,
+                   a.photo_url as author_photo,
+                   v.thumbnail_url as cover_image,
+                   v.description,
+                   CAST(NULL AS TEXT) as content,
+                   v.created_at as created_at,
+                   v.like_count as like_count,
+                   v.comment_count as comment_count
+            FROM accounts_video v
+            LEFT JOIN accounts_author a ON v.author_id = a.id""",
+        'table': 'accounts_video',
+        'where': ("is_active IS TRUE",),
+    },
+    'image': {
+        'alias': 'i',
+        'select': """
+            SELECT 'image' as type, i.id as id, i.title,
+                   COALESCE(a.name, 'Unknown') as author_name,
+                   a.photo_url as author_photo,
+                   i.image_url as cover_image,
+                   i.description,
+                   CAST(NULL AS TEXT) as content,
+                   i.created_at as created_at,
+                   i.like_count as like_count,
+                   i.comment_count as comment_count
+            FROM accounts_image i
+            LEFT JOIN accounts_author a ON i.author_id = a.id""",
+        'table': 'accounts_image',
+        'where': ("is_active IS TRUE",),
+    },
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def parse_feed_types(value):
+    """Parse a ?types=poem,story value into a tuple in FEED_TYPES order (all types when empty)"""
+    if not value:
+        return FEED_TYPES
+    requested = {part.strip() for part in value.split(',') if part.strip()}
+    unknown = requested.difference(FEED_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown content type(s): {', '.join(sorted(unknown))}")
+    return tuple(content_type for content_type in FEED_TYPES if content_type in requested) or FEED_TYPES
+
+
+def _encode_position(timestamp, content_type, content_id):
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.isoformat()
+    raw = json.dumps([timestamp, content_type, content_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def encode_cursor(item):
+    """Encode the (created_at, type, id) position of a feed row as an opaque token"""
+    return _encode_position(item['created_at'], item['type'], item['id'])
+
+
+def decode_cursor(token):
+    """Decode a token from encode_cursor (or a sync token) back into (timestamp, type, id)"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        timestamp, content_type, content_id = json.loads(base64.urlsafe_b64decode(padded))
+        timestamp = datetime.fromisoformat(timestamp)
+        content_id = int(content_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if content_type not in FEED_BRANCHES:
+        raise InvalidCursor("Invalid cursor")
+    return timestamp, content_type, content_id
+
+
+def _cursor_predicate(content_type, alias, cursor):
+    """
+    Rows strictly after the cursor in (created_at, type, id) DESC order.
+
+    The type is constant inside a branch, so the tuple comparison collapses
+    to a plain range on created_at (plus id on the cursor's own type) that
+    the (is_active, -created_at) indexes can serve.
+    """
+    created_at, cursor_type, cursor_id = cursor
+    created_at = connection.ops.adapt_datetimefield_value(created_at)  # As the ORM binds it, aware or naive
+    if content_type < cursor_type:
+        return f"{alias}.created_at <= %s", [created_at]
+    if content_type > cursor_type:
+        return f"{alias}.created_at < %s", [created_at]
+    return (
+        f"({alias}.created_at < %s OR ({alias}.created_at = %s AND {alias}.id < %s))",
+        [created_at, created_at, cursor_id],
+    )
+
+
+def _branch_query(content_type, cursor=None):
+    """SELECT ... WHERE for one content type, with the keyset predicate when a cursor is given"""
+    branch = FEED_BRANCHES[content_type]
+    alias = branch['alias']
+    conditions = [f"{alias}.{condition}" for condition in branch['where']]
+    params = []
+    if cursor is not None:
+        predicate, params = _cursor_predicate(content_type, alias, cursor)
+        conditions.append(predicate)
+    return f"{branch['select']}\n            WHERE {' AND '.join(conditions)}", params
+
+
+def build_feed_query(limit, offset=0, cursor=None, types=FEED_TYPES):
+    """
+    Build the UNION ALL feed query over the requested content types only.
+
+    With a cursor the OFFSET is replaced by a keyset predicate.
+    """
+    branches = []
+    params = []
+    for content_type in types:
+        branch_sql, branch_params = _branch_query(content_type, cursor)
+        branches.append(branch_sql)
+        params.extend(branch_params)
+
+    sql = "\n            UNION ALL\n".join(branches)
+    sql += "\n            ORDER BY created_at DESC, type DESC, id DESC\n            LIMIT %s"
+    params.append(limit)
+    if cursor is None:
+        sql += " OFFSET %s"
+        params.append(offset)
+    return sql, params
+
+
+def _fetch_sql_page(limit, offset, cursor, types):
+    sql, params = build_feed_query(limit, offset, cursor, types)
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        columns = [col[0] for col in db_cursor.description]
+        return [dict(zip(columns, row)) for row in db_cursor.fetchall()]
+
+
+def _change_position(row):
+    return row['updated_at'], row['type'], row['id']
+
+
+def fetch_feed_changes(since, limit, types=FEED_TYPES):
+    """
+    Return (resent, changes, has_more) for the FeedItems created, changed or
+    hidden after `since`, oldest change first.
+
+    `since` is either a datetime (strictly after it) or an (updated_at, type, id)
+    position from a previous sync token. updated_at is set before the writing
+    transaction commits, so a row can become visible after a client synced past
+    its updated_at: the rows changed in the FEED_SYNC_OVERLAP seconds up to
+    `since` are re-read and come back as `resent` (clients upsert by type and
+    id, so a row they already have is harmless). `changes` holds up to `limit`
+    rows after `since`. Rows are feed dicts plus 'is_visible' and 'updated_at'.
+    """
+    if isinstance(since, datetime):
+        since_time, position = since, None
+    else:
+        since_time, position = since[0], since
+
+    items = FeedItem.objects.filter(updated_at__gt=since_time - timedelta(seconds=settings.FEED_SYNC_OVERLAP))
+    if len(types) < len(FEED_TYPES):
+        items = items.filter(content_type__in=types)
+    columns = FEED_COLUMNS + ('is_visible', 'updated_at')
+    items = items.order_by('updated_at', 'content_type', 'content_id').values_list(
+        'content_type', 'content_id', 'title', 'author_name', 'author_photo',
+        'cover_image', 'description', 'content', 'created_at', 'is_visible', 'updated_at',
+    )
+
+    resent, changes = [], []
+    for row in items.iterator():
+        row = dict(zip(columns, row))
+        if position is None:
+            seen = row['updated_at'] <= since_time
+        else:
+            seen = _change_position(row) <= position
+        if seen:
+            resent.append(row)
+        elif len(changes) < limit:
+            changes.append(row)
+        else:
+            return resent, changes, True
+    return resent, changes, False
+
+
+def encode_sync_token(item):
+    """Encode the (updated_at, type, id) position of the last change a client has seen"""
+    return _encode_position(item['updated_at'], item['type'], item['id'])
+
+
+def parse_since(value):
+    """Parse ?since= as an ISO timestamp or a sync token"""
+    try:
+        timestamp = datetime.fromisoformat(value.replace(' ', '+'))
+    except ValueError:
+        return decode_cursor(value)
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp, dt_timezone.utc)
+    return timestamp
+
+
+def _feed_sort_key(item):
+    return item['created_at'], item['type'], item['id']
+
+
+def _fetch_merged_page(limit, offset, cursor, types):
+    """
+    Top-N per content type, merged in Python.
+
+    Each type runs its own index-ordered LIMIT offset+limit query, so no
+    branch reads more than one page's worth of rows past the offset; the
+    already-sorted branches are then k-way merged with heapq.merge.
+    """
+    if cursor is not None:
+        offset = 0
+    branch_limit = offset + limit
+
+    branches = []
+    with connection.cursor() as db_cursor:
+        for content_type in types:
+            alias = FEED_BRANCHES[content_type]['alias']
+            sql, params = _branch_query(content_type, cursor)
+            db_cursor.execute(
+                f"{sql}\n            ORDER BY {alias}.created_at DESC, {alias}.id DESC\n            LIMIT %s",
+                params + [branch_limit],
+            )
+            columns = [col[0] for col in db_cursor.description]
+            branches.append([dict(zip(columns, row)) for row in db_cursor.fetchall()])
+
+    merged = heapq.merge(*branches, key=_feed_sort_key, reverse=True)
+    return list(islice(merged, offset, offset + limit))
+
+
+def _fetch_materialized_page(limit, offset, cursor, types):
+    items = FeedItem.objects.filter(is_visible=True)
+    if len(types) < len(FEED_TYPES):
+        items = items.filter(content_type__in=types)
+    if cursor is not None:
+        created_at, cursor_type, cursor_id = cursor
+        items = items.filter(
+            Q(created_at__lt=created_at)
+            | Q(created_at=created_at, content_type__lt=cursor_type)
+            | Q(created_at=created_at, content_type=cursor_type, content_id__lt=cursor_id)
+        )
+        offset = 0
+    items = items.order_by('-created_at', '-content_type', '-content_id').values_list(
+        'content_type', 'content_id', 'title', 'author_name', 'author_photo',
+        'cover_image', 'description', 'content', 'created_at',
+    )
+    return [dict(zip(FEED_COLUMNS, row)) for row in items[offset:offset + limit]]
+
+
+FEED_ENGINES = {
+    'sql': _fetch_sql_page,
+    'merge': _fetch_merged_page,
+    'materialized': _fetch_materialized_page,
+}
+
+
+def fetch_feed_page(limit, offset=0, cursor=None, engine=None, types=FEED_TYPES):
+    """Return one page of feed rows as dicts, newest first, using settings.FEED_ENGINE by default"""
+    engine = engine or getattr(settings, 'FEED_ENGINE', 'sql')
+    if engine not in FEED_ENGINES:
+        raise ValueError(f"Unknown feed engine: {engine}")
+    return FEED_ENGINES[engine](limit, offset, cursor, types)
+
+
+# ============================================
+# FEED TOTAL COUNT
+# ============================================
+
+FEED_COUNT_TIMEOUT = 600  # Safety net: cached counts are rebuilt at least this often
+
+
+def _count_cache_key(content_type):
+    return f"feed:count:{content_type}"
+
+
+def _count_visible(content_type):
+    branch = FEED_BRANCHES[content_type]
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(f"SELECT COUNT(*) FROM {branch['table']} WHERE {' AND '.join(branch['where'])}")
+        return db_cursor.fetchone()[0]
+
+
+def count_feed_items(types=FEED_TYPES):
+    """
+    Return the number of visible feed rows for the given content types.
+
+    Counts are cached per type and adjusted by the content save/delete
+    signals, so a warm cache answers without touching the database. A count is
+    only cached if no write missed the cache while it ran (the type's
+    generation did not move), so it cannot overwrite a newer adjustment. With a
+    per-process cache every request counts, since other workers' writes would
+    go unseen.
+    """
+    if not cache_is_shared():
+        return sum(_count_visible(content_type) for content_type in types)
+
+    keys = {content_type: _count_cache_key(content_type) for content_type in types}
+    cached = cache.get_many(keys.values())
+    missing = [content_type for content_type in types if keys[content_type] not in cached]
+    namespaces = [_count_cache_key(content_type) for content_type in missing]
+    before = get_generations(namespaces)
+
+    total = sum(cached.values())
+    counted = {}
+    for content_type in missing:
+        counted[content_type] = _count_visible(content_type)
+        total += counted[content_type]
+
+    for content_type, generation, current in zip(missing, before, get_generations(namespaces)):
+        if generation == current:
+            cache.add(keys[content_type], counted[content_type], FEED_COUNT_TIMEOUT)
+    return total
+
+
+def adjust_feed_count(content_type, delta):
+    """Apply a visibility change to the cached count once the write commits"""
+    def apply():
+        try:
+            cache.incr(_count_cache_key(content_type), delta)
+        except ValueError:
+            # Not cached: discard any count started before this write
+            bump_generation(_count_cache_key(content_type))
+    transaction.on_commit(apply)
+
+
+# ============================================
+# MATERIALIZED FEED (FeedItem)
+# ============================================
+
+def _author_card(instance):
+    """Author name/photo with the same fallbacks as the SQL feed (Author, then AppUser)"""
+    author = instance.author
+    user = getattr(instance, 'user', None)
+    name = (author.name if author else None) or (user.username if user else None) or 'Unknown'
+    photo = (author.photo_url if author else None) or (user.profile_photo if user else None)
+    return name, photo
+
+
+def feed_item_values(content_type, instance):
+    """Build the FeedItem field values for a content instance"""
+    author_name, author_photo = _author_card(instance)
+    values = {
+        'title': instance.title,
+        'author_id': instance.author_id,
+        'user_id': getattr(instance, 'user_id', None),
+        'author_name': author_name,
+        'author_photo': author_photo,
+        'description': None,
+        'content': None,
+        'is_visible': instance.is_active,
+        'created_at': instance.created_at,
+    }
+
+    if content_type == 'book':
+        values['cover_image'] = instance.cover_image_url
+        values['description'] = instance.description
+    elif content_type == 'poem':
+        values['cover_image'] = instance.background_image_url
+        values['description'] = instance.description
+        values['content'] = instance.content
+        values['is_visible'] = instance.is_active and instance.is_approved
+    elif content_type == 'story':
+        values['cover_image'] = instance.cover_image_url
+        values['content'] = instance.content[:STORY_EXCERPT_LENGTH]
+        values['is_visible'] = instance.is_active and instance.is_approved
+    elif content_type == 'video':
+        values['cover_image'] = instance.thumbnail_url
+        values['description'] = instance.description
+    elif content_type == 'image':
+        values['cover_image'] = instance.image_url
+        values['description'] = instance.description
+    else:
+        values['cover_image'] = instance.cover_image_url
+        values['description'] = instance.description
+
+    return values
+
+
+def sync_feed_item(content_type, instance):
+    """
+    Create or update the FeedItem for a saved content instance.
+
+    Returns (was_visible, is_visible) so callers can track visibility changes.
+    """
+    values = feed_item_values(content_type, instance)
+    item = FeedItem.objects.filter(content_type=content_type, content_id=instance.pk).first()
+    if item is None:
+        FeedItem.objects.create(content_type=content_type, content_id=instance.pk, **values)
+        return False, values['is_visible']
+
+    was_visible = item.is_visible
+    changed = [field for field, value in values.items() if getattr(item, field) != value]
+    if changed:
+        # Only real changes bump updated_at, which drives the ?since= delta sync
+        for field in changed:
+            setattr(item, field, values[field])
+        item.save(update_fields=changed + ['updated_at'])
+    return was_visible, item.is_visible
+
+
+def remove_feed_item(content_type, content_id):
+    """
+    Turn the FeedItem of a deleted content instance into a tombstone.
+
+    The row stays (hidden) so ?since= syncs can report the deletion.
+    Returns whether it was visible.
+    """
+    item = FeedItem.objects.filter(content_type=content_type, content_id=content_id).first()
+    if item is None or not item.is_visible:
+        return False
+    item.is_visible = False
+    item.save(update_fields=['is_visible', 'updated_at'])
+    return True
+
+
+def _content_queryset(content_type):
+    model = CONTENT_MODELS[content_type]
+    queryset = model.objects.select_related('author')
+    if any(field.name == 'user' for field in model._meta.fields):
+        queryset = queryset.select_related('user')
+    return queryset
+
+
+def resync_feed_items(**filters):
+    """Re-sync the FeedItems matching filters (e.g. author_id=...) from their content rows"""
+    ids_by_type = {}
+    for content_type, content_id in FeedItem.objects.filter(**filters).values_list('content_type', 'content_id'):
+        ids_by_type.setdefault(content_type, []).append(content_id)
+
+    for content_type, ids in ids_by_type.items():
+        for instance in _content_queryset(content_type).filter(pk__in=ids):
+            sync_feed_item(content_type, instance)
+
+
+def rebuild_feed_items(batch_size=500):
+    """
+    Rebuild the whole FeedItem table from the content tables; returns the row count.
+
+    Rows whose content no longer exists are kept as hidden tombstones.
+    """
+    items = []
+    for content_type in FEED_TYPES:
+        for instance in _content_queryset(content_type).iterator(chunk_size=batch_size):
+            items.append(FeedItem(
+                content_type=content_type,
+                content_id=instance.pk,
+                **feed_item_values(content_type, instance),
+            ))
+    live = {(item.content_type, item.content_id) for item in items}
+
+    with transaction.atomic():
+        stale_ids = [
+            pk for pk, content_type, content_id
+            in FeedItem.objects.values_list('pk', 'content_type', 'content_id').iterator()
+            if (content_type, content_id) not in live
+        ]
+        FeedItem.objects.filter(pk__in=stale_ids, is_visible=True).update(is_visible=False, updated_at=timezone.now())
+        FeedItem.objects.exclude(pk__in=stale_ids).delete()
+        FeedItem.objects.bulk_create(items, batch_size=batch_size)
+    return len(items)
+
+
+def _grouped_counts(model, condition):
+    """Return {(type, id): count} for a generic content model in one GROUP BY query"""
+    rows = (
+        model.objects.filter(condition)
+        .order_by()
+        .values('content_type', 'content_id')
+        .annotate(total=Count('id'))
+    )
+    return {(row['content_type'], row['content_id']): row['total'] for row in rows}
+
+
+def enrich_feed_items(items, user_id=None):
+    """
+    Add like_count, comment_count, user_liked and user_saved to a page of feed items.
+
+    Rows from the SQL engines already carry the denormalized counters; the
+    others get them from two grouped queries, no matter how many items are
+    on the page. User flags come from the user's cached liked/saved sets (or one
+    query each without a shared cache, see accounts.personalization).
+    """
+    if not items:
+        return items
+
+    uncounted = [item for item in items if 'like_count' not in item]
+    if uncounted:
+        condition = pairs_filter((item['type'], item['id']) for item in uncounted)
+        like_counts = _grouped_counts(Like, condition)
+        comment_counts = _grouped_counts(Comment, condition)
+        for item in uncounted:
+            key = (item['type'], item['id'])
+            item['like_count'] = like_counts.get(key, 0)
+            item['comment_count'] = comment_counts.get(key, 0)
+
+    keys = {(item['type'], item['id']) for item in items}
+    liked = find_user_likes(user_id, keys)
+    saved = find_user_bookmarks(user_id, keys)
+
+    for item in items:
+        key = (item['type'], item['id'])
+        item['user_liked'] = key in liked
+        item['user_saved'] = key in saved
+
+    return items
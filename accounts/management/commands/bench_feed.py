@@ -0,0 +1,63 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.feed import FEED_ENGINES, decode_cursor, encode_cursor, fetch_feed_page, parse_feed_types
+
+
+class Command(BaseCommand):
+    help = "Compare feed engines (page latency and query count) on the current database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', default=','.join(FEED_ENGINES), help="Comma-separated engine names")
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--offsets', default='0,100,1000', help="Comma-separated offsets to measure")
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--types', default='', help="Comma-separated content types (default: all)")
+        parser.add_argument('--cursor', action='store_true', help="Also walk the offsets with keyset cursors")
+
+    def handle(self, *args, **options):
+        engines = [engine.strip() for engine in options['engines'].split(',') if engine.strip()]
+        unknown = [engine for engine in engines if engine not in FEED_ENGINES]
+        if unknown:
+            raise CommandError(f"Unknown engine(s): {', '.join(unknown)}")
+
+        limit = options['limit']
+        offsets = [int(offset) for offset in options['offsets'].split(',')]
+        repeat = options['repeat']
+        try:
+            types = parse_feed_types(options['types'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'engine':<14}{'mode':<8}{'offset':>8}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}")
+        for engine in engines:
+            for offset in offsets:
+                self._report(engine, 'offset', offset, repeat, lambda: fetch_feed_page(limit, offset, engine=engine, types=types))
+                if options['cursor']:
+                    cursor = self._cursor_at(engine, offset, types)
+                    if cursor is not None:
+                        self._report(engine, 'cursor', offset, repeat, lambda: fetch_feed_page(limit, cursor=cursor, engine=engine, types=types))
+
+    def _cursor_at(self, engine, offset, types):
+        if offset == 0:
+            return None
+        rows = fetch_feed_page(1, offset - 1, engine=engine, types=types)
+        return decode_cursor(encode_cursor(rows[0])) if rows else None
+
+    def _report(self, engine, mode, offset, repeat, run):
+        run()  # Warm up connection and caches
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{engine:<14}{mode:<8}{offset:>8}{len(queries):>9}{statistics.median(timings):>10.2f}{p95:>10.2f}"
+        )
@@ -0,0 +1,67 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from accounts.feed import FEED_COLUMNS, enrich_feed_items, fetch_feed_page
+from accounts.renderers import ORJSONRenderer, orjson
+
+SAMPLE_TEXT = "मन की बात कविता में ढल गई, शब्दों ने सपनों को आवाज़ दी। " * 20
+
+
+class Command(BaseCommand):
+    help = "Compare JSON encode time of DRF's JSONRenderer and ORJSONRenderer on a large feed page"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=500, help="Feed items on the page")
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--synthetic', action='store_true', help="Use generated Hindi feed rows instead of the database")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed; ORJSONRenderer would fall back to the stdlib encoder")
+
+        limit = options['limit']
+        items = self._synthetic(limit) if options['synthetic'] else fetch_feed_page(limit)
+        if not items:
+            raise CommandError("The feed is empty; rerun with --synthetic")
+        if not options['synthetic']:
+            enrich_feed_items(items, None)
+        page = {"total": len(items), "has_more": False, "next": None, "items": items}
+
+        self.stdout.write(f"{len(items)} items, {len(JSONRenderer().render(page)) / 1024:.1f} KiB")
+        self.stdout.write(f"{'renderer':<16}{'p50 ms':>10}{'p95 ms':>10}")
+        results = {}
+        for name, renderer in (('json', JSONRenderer()), ('orjson', ORJSONRenderer())):
+            results[name] = self._report(name, options['repeat'], lambda: renderer.render(page))
+        self.stdout.write(f"orjson speedup: {results['json'] / results['orjson']:.1f}x")
+
+    def _synthetic(self, limit):
+        now = timezone.now()
+        rows = []
+        for i in range(limit):
+            row = dict.fromkeys(FEED_COLUMNS)
+            row.update(
+                type='poem', id=i, title=f"कविता {i}", author_name="लेखक",
+                author_photo="https://example.com/photo.jpg", description=SAMPLE_TEXT[:200],
+                content=SAMPLE_TEXT, created_at=now - timedelta(minutes=i),
+                like_count=i % 50, comment_count=i % 7, user_liked=False, user_saved=False,
+            )
+            rows.append(row)
+        return rows
+
+    def _report(self, name, repeat, run):
+        run()  # Warm up
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(f"{name:<16}{p50:>10.2f}{p95:>10.2f}")
+        return p50
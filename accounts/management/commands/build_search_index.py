@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.search import autocomplete, inverted
+
+
+class Command(BaseCommand):
+    help = "Rebuild the in-process search and autocomplete indexes and write them to their files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help="Write the search index here instead of SEARCH_INDEX_PATH")
+        parser.add_argument('--autocomplete-path', help="Write the autocomplete index here instead of AUTOCOMPLETE_INDEX_PATH")
+
+    def handle(self, *args, **options):
+        search_path = options['path'] or settings.SEARCH_INDEX_PATH
+        autocomplete_path = options['autocomplete_path'] or settings.AUTOCOMPLETE_INDEX_PATH
+        if not search_path and not autocomplete_path:
+            raise CommandError("Set SEARCH_INDEX_PATH / AUTOCOMPLETE_INDEX_PATH or pass --path / --autocomplete-path")
+        if search_path:
+            index = inverted.rebuild_index(search_path)
+            self.stdout.write(self.style.SUCCESS(f"Indexed {index.live} documents into {search_path}"))
+        if autocomplete_path:
+            autocomplete.rebuild_index(autocomplete_path)
+            self.stdout.write(self.style.SUCCESS(f"Wrote the autocomplete index to {autocomplete_path}"))
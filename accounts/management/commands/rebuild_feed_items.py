@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.feed import rebuild_feed_items
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized FeedItem table from all content tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_feed_items(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} feed items"))
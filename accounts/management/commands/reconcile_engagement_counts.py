@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.engagement import reconcile_counters, reconcile_ratings
+from accounts.models import CONTENT_MODELS
+
+
+class Command(BaseCommand):
+    help = "Fix drift in the like/comment counters and the book/poem rating columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--types', default='', help="Comma-separated content types (default: all)")
+
+    def handle(self, *args, **options):
+        types = [content_type.strip() for content_type in options['types'].split(',') if content_type.strip()]
+        unknown = [content_type for content_type in types if content_type not in CONTENT_MODELS]
+        if unknown:
+            raise CommandError(f"Unknown content type(s): {', '.join(unknown)}")
+
+        fixed = reconcile_counters(types or None)
+        fixed.update(reconcile_ratings(types or None))
+        for (content_type, field), rows in fixed.items():
+            if rows:
+                self.stdout.write(f"{content_type}.{field}: fixed {rows} row(s)")
+        self.stdout.write(self.style.SUCCESS(f"Reconciled counters, {sum(fixed.values())} row(s) fixed"))
@@ -0,0 +1,57 @@
+"""
+Static metadata bundle behind /api/meta/: every choice table plus the active
+categories, so an app fetches all of them in one request at startup.
+
+Choice tables only change with a release and are built once at import.
+Categories live in the database; the bundle is rebuilt (one query) when the
+"categories" cache generation moves, and its rendered body is kept in process
+for at most META_BUNDLE_TTL seconds, so a worker that missed a bump (per-process
+cache, or a change made with .update()) still catches up. The body carries a content hash as its version and ETag, so clients
+keep it across launches and revalidate with If-None-Match (304, no body).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+
+from .cache import get_generations
+from .models import Audiobook, Book, Bookmark, Category, Image, Poem, ShortStory, Video
+from .renderers import ORJSONRenderer
+from .serializers import CategorySerializer
+
+# Bundle key -> model choices; GenreChoicesView/PoemGenreChoicesView serve two of them on their own
+CHOICE_TABLES = {
+    'book_genres': Book.GENRE_CHOICES,
+    'book_file_types': Book.FILE_TYPE_CHOICES,
+    'poem_genres': Poem.GENRE_CHOICES,
+    'poem_categories': Poem.CATEGORY_CHOICES,
+    'story_genres': ShortStory.GENRE_CHOICES,
+    'audiobook_genres': Audiobook.GENRE_CHOICES,
+    'video_categories': Video.CATEGORY_CHOICES,
+    'image_categories': Image.CATEGORY_CHOICES,
+    'content_types': Bookmark.CONTENT_TYPE_CHOICES,
+}
+
+CHOICES = {
+    name: [{"value": value, "label": label} for value, label in choices]
+    for name, choices in CHOICE_TABLES.items()
+}
+
+_bundle = None  # (categories generation, expiry on the monotonic clock, body, ETag)
+
+
+def _render(data):
+    return ORJSONRenderer().render(data)
+
+
+def meta_bundle():
+    """(JSON body, strong ETag) of the current bundle, rebuilt after a category change or once it expires"""
+    global _bundle
+    generation, = get_generations(["categories"])
+    now = time.monotonic()
+    if _bundle is None or _bundle[0] != generation or _bundle[1] <= now:
+        categories = Category.objects.filter(is_active=True).order_by('name')
+        data = {"choices": CHOICES, "categories": CategorySerializer(categories, many=True).data}
+        version = hashlib.sha256(_render(data)).hexdigest()[:20]
+        _bundle = (generation, now + settings.META_BUNDLE_TTL, _render({"version": version, **data}), f'"{version}"')
+    return _bundle[2], _bundle[3]
@@ -0,0 +1,127 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+Like django.middleware.gzip.GZipMiddleware (same BREACH padding, ETag
+weakening and streaming support), plus:
+- brotli when the brotli/brotlicffi package is installed and the client prefers it or
+  ranks it equal to gzip,
+- a configurable size threshold (settings.COMPRESSION_MIN_SIZE),
+- no work for content types that are already compressed (images, audio, video, archives).
+"""
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+BROTLI_QUALITY = 5  # Good ratio at a CPU cost close to gzip level 6 for dynamic responses
+
+INCOMPRESSIBLE_TYPES = ('image/', 'audio/', 'video/', 'application/zip', 'application/gzip', 'application/pdf')
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header value"""
+    encodings = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[coding] = q
+    return encodings
+
+
+def choose_encoding(header):
+    """'br', 'gzip' or None for an Accept-Encoding header value"""
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get('*', 0.0)
+    gzip_q = encodings.get('gzip', wildcard)
+    br_q = encodings.get('br', wildcard) if brotli is not None else 0.0
+    if br_q > 0 and br_q >= gzip_q:
+        return 'br'
+    if gzip_q > 0:
+        return 'gzip'
+    return None
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    max_random_bytes = 100  # BREACH mitigation for gzip, as in GZipMiddleware
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        if response.get('Content-Type', '').startswith(INCOMPRESSIBLE_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async(response.streaming_content, encoding)
+            elif encoding == 'br':
+                response.streaming_content = _brotli_sequence(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, max_random_bytes=self.max_random_bytes
+                )
+            # The compressed size is unknown until the stream ends
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # A strong ETag must change with the encoding; a weak one still matches If-None-Match
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compress_async(self, iterator, encoding):
+        async def compress():
+            if encoding == 'br':
+                compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+                async for chunk in iterator:
+                    data = compressor.process(chunk) + compressor.flush()
+                    if data:
+                        yield data
+                yield compressor.finish()
+            else:
+                async for chunk in iterator:
+                    yield compress_string(chunk, max_random_bytes=self.max_random_bytes)
+        return compress()
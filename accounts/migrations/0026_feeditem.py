@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0025_alter_story_image_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.CharField(choices=[('book', 'Book'), ('poem', 'Poem'), ('story', 'Short Story'), ('audiobook', 'Audiobook'), ('video', 'Video'), ('image', 'Image')], max_length=20)),
+                ('content_id', models.IntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('author_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('user_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('author_name', models.CharField(default='Unknown', max_length=150)),
+                ('author_photo', models.URLField(blank=True, null=True)),
+                ('cover_image', models.URLField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('content', models.TextField(blank=True, null=True)),
+                ('is_visible', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_visible', '-created_at', '-content_type', '-content_id'], name='accounts_fe_is_visi_05210a_idx')],
+                'unique_together': {('content_type', 'content_id')},
+            },
+        ),
+    ]
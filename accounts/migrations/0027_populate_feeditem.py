@@ -0,0 +1,61 @@
+from django.db import migrations
+
+
+STORY_EXCERPT_LENGTH = 2000
+
+# content type -> (model name, cover field, has description, has user, needs approval)
+FEED_SOURCES = {
+    'book': ('Book', 'cover_image_url', True, False, False),
+    'poem': ('Poem', 'background_image_url', True, True, True),
+    'story': ('ShortStory', 'cover_image_url', False, True, True),
+    'audiobook': ('Audiobook', 'cover_image_url', True, False, False),
+    'video': ('Video', 'thumbnail_url', True, False, False),
+    'image': ('Image', 'image_url', True, False, False),
+}
+
+
+def populate_feed_items(apps, schema_editor):
+    FeedItem = apps.get_model('accounts', 'FeedItem')
+    items = []
+    for content_type, (model_name, cover_field, has_description, has_user, needs_approval) in FEED_SOURCES.items():
+        model = apps.get_model('accounts', model_name)
+        queryset = model.objects.select_related('author', 'user' if has_user else 'author')
+        for obj in queryset.iterator(chunk_size=500):
+            author = obj.author
+            user = obj.user if has_user else None
+            content = None
+            if content_type == 'poem':
+                content = obj.content
+            elif content_type == 'story':
+                content = obj.content[:STORY_EXCERPT_LENGTH]
+            items.append(FeedItem(
+                content_type=content_type,
+                content_id=obj.pk,
+                title=obj.title,
+                author_id=obj.author_id,
+                user_id=obj.user_id if has_user else None,
+                author_name=(author.name if author else None) or (user.username if user else None) or 'Unknown',
+                author_photo=(author.photo_url if author else None) or (user.profile_photo if user else None),
+                cover_image=getattr(obj, cover_field),
+                description=obj.description if has_description else None,
+                content=content,
+                is_visible=obj.is_active and (obj.is_approved if needs_approval else True),
+                created_at=obj.created_at,
+            ))
+    FeedItem.objects.all().delete()
+    FeedItem.objects.bulk_create(items, batch_size=500)
+
+
+def clear_feed_items(apps, schema_editor):
+    apps.get_model('accounts', 'FeedItem').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0026_feeditem'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_feed_items, clear_feed_items),
+    ]
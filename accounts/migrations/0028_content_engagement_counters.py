@@ -0,0 +1,100 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:58
+
+from django.db import migrations, models
+
+
+CONTENT_MODELS = {
+    'book': 'Book',
+    'poem': 'Poem',
+    'story': 'ShortStory',
+    'audiobook': 'Audiobook',
+    'video': 'Video',
+    'image': 'Image',
+}
+
+
+def populate_counters(apps, schema_editor):
+    Like = apps.get_model('accounts', 'Like')
+    Comment = apps.get_model('accounts', 'Comment')
+    for content_type, model_name in CONTENT_MODELS.items():
+        model = apps.get_model('accounts', model_name)
+        for field, source in (('like_count', Like), ('comment_count', Comment)):
+            rows = (
+                source.objects.filter(content_type=content_type)
+                .order_by()
+                .values('content_id')
+                .annotate(total=models.Count('id'))
+            )
+            for row in rows:
+                model.objects.filter(pk=row['content_id']).update(**{field: row['total']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0027_populate_feeditem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiobook',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='audiobook',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='shortstory',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='shortstory',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:02
+
+from django.db import migrations, models
+
+
+RATED_MODELS = {
+    'Book': ('BookReview', 'book_id'),
+    'Poem': ('PoemReview', 'poem_id'),
+}
+
+
+def populate_ratings(apps, schema_editor):
+    for model_name, (review_name, fk) in RATED_MODELS.items():
+        model = apps.get_model('accounts', model_name)
+        review = apps.get_model('accounts', review_name)
+        rows = (
+            review.objects.order_by()
+            .values(fk)
+            .annotate(total=models.Sum('rating'), count=models.Count('id'))
+        )
+        for row in rows:
+            model.objects.filter(pk=row[fk]).update(
+                rating_sum=row['total'],
+                rating_count=row['count'],
+                average_rating=round(row['total'] / row['count'], 1),
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0028_content_engagement_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='average_rating',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='average_rating',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['is_active', '-average_rating'], name='accounts_bo_is_acti_1ff46c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poem',
+            index=models.Index(fields=['is_active', '-average_rating'], name='accounts_po_is_acti_56e113_idx'),
+        ),
+        migrations.RunPython(populate_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:03
+
+from django.db import migrations, models
+
+
+RATED_MODELS = {
+    'Book': ('BookReview', 'book_id'),
+    'Poem': ('PoemReview', 'poem_id'),
+}
+
+
+def populate_distribution(apps, schema_editor):
+    for model_name, (review_name, fk) in RATED_MODELS.items():
+        model = apps.get_model('accounts', model_name)
+        review = apps.get_model('accounts', review_name)
+        rows = (
+            review.objects.filter(rating__in=range(1, 6))
+            .order_by()
+            .values(fk, 'rating')
+            .annotate(count=models.Count('id'))
+        )
+        for row in rows:
+            model.objects.filter(pk=row[fk]).update(**{f"rating_{row['rating']}": row['count']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0029_content_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='poem',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_distribution, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:40
+
+from django.db import migrations
+
+
+# table -> (column, weight) folded into its search_vector; A ranks highest
+SEARCH_DOCUMENTS = {
+    'accounts_poem': (('title', 'A'), ('description', 'B'), ('content', 'C')),
+    'accounts_shortstory': (('title', 'A'), ('content', 'C')),
+    'accounts_book': (('title', 'A'), ('description', 'B')),
+}
+
+# Same folding as accounts.search.normalize_text: NFKC, chandrabindu -> anusvara,
+# nukta and zero-width (non-)joiners dropped
+NORMALIZE_FUNCTION = """
+CREATE OR REPLACE FUNCTION accounts_search_text(value text) RETURNS text AS $$
+    SELECT translate(normalize(coalesce(value, ''), NFKC), U&'\\0901\\093C\\200C\\200D', U&'\\0902')
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+"""
+
+
+def _document(table, row):
+    return ' || '.join(
+        f"setweight(to_tsvector('simple', accounts_search_text({row}.{column})), '{weight}')"
+        for column, weight in SEARCH_DOCUMENTS[table]
+    )
+
+
+def create_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(NORMALIZE_FUNCTION)
+    for table, columns in SEARCH_DOCUMENTS.items():
+        names = ', '.join(column for column, _ in columns)
+        schema_editor.execute(f'ALTER TABLE {table} ADD COLUMN search_vector tsvector')
+        schema_editor.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {_document(table, 'NEW')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {table}_search_vector
+            BEFORE INSERT OR UPDATE OF {names} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector()
+        """)
+        schema_editor.execute(f'UPDATE {table} SET search_vector = {_document(table, table)}')
+        schema_editor.execute(f'CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector)')
+
+
+def drop_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCH_DOCUMENTS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector ON {table}')
+        schema_editor.execute(f'DROP FUNCTION IF EXISTS {table}_search_vector()')
+        schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+    schema_editor.execute('DROP FUNCTION IF EXISTS accounts_search_text(text)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0030_content_rating_distribution'),
+    ]
+
+    operations = [
+        # PostgreSQL only: the column, its trigger and GIN index live outside the Django model
+        # state (see accounts.search), so other backends simply search with icontains
+        migrations.RunPython(create_search_vectors, drop_search_vectors),
+    ]
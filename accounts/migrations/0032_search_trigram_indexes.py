@@ -0,0 +1,47 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:20
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# table -> column matched by /api/search/ (see accounts.search.unified)
+TRIGRAM_COLUMNS = {
+    'accounts_book': 'title',
+    'accounts_poem': 'title',
+    'accounts_shortstory': 'title',
+    'accounts_audiobook': 'title',
+    'accounts_video': 'title',
+    'accounts_image': 'title',
+    'accounts_author': 'name',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in TRIGRAM_COLUMNS.items():
+        # On the folded text (accounts_search_text from 0031), which is what the queries compare
+        schema_editor.execute(
+            f'CREATE INDEX {table}_{column}_trgm ON {table} '
+            f'USING gin (accounts_search_text({column}) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in TRIGRAM_COLUMNS.items():
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0031_content_search_vectors'),
+    ]
+
+    operations = [
+        # Both are no-ops on other databases (CreateExtension checks the vendor itself)
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
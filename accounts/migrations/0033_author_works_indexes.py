@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0032_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='audiobook',
+            index=models.Index(fields=['author', 'is_active', '-created_at'], name='accounts_au_author__aff41c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['author', 'is_active', '-created_at'], name='accounts_im_author__e427c7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poem',
+            index=models.Index(fields=['author', 'is_active', '-created_at'], name='accounts_po_author__d97ae5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shortstory',
+            index=models.Index(fields=['author', 'is_active', '-created_at'], name='accounts_sh_author__6c21eb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['author', 'is_active', '-created_at'], name='accounts_vi_author__3f5230_idx'),
+        ),
+    ]
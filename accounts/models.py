@@ -77,6 +77,52 @@ class Author(models.Model):
     def __str__(self):
         return self.name
 
+
+class ApiQuerySet(models.QuerySet):
+    """Base queryset whose for_api() joins every relation the model's API serializer reads"""
+    api_related = ()
+
+    def for_api(self):
+        return self.select_related(*self.api_related)
+
+
+class ShortStoryQuerySet(ApiQuerySet):
+    api_related = ('author', 'user')
+
+
+class AuthoredQuerySet(ApiQuerySet):
+    """Audiobook, Video and Image serializers read author name/photo"""
+    api_related = ('author',)
+
+
+class UserActionQuerySet(ApiQuerySet):
+    """Bookmark, Like and Comment serializers read user name/photo"""
+    api_related = ('user',)
+
+
+RATING_STARS = (1, 2, 3, 4, 5)
+# Per-star review counters on Book and Poem
+RATING_STAR_FIELDS = tuple(f'rating_{star}' for star in RATING_STARS)
+
+
+def _rating_stats(relation):
+    stats = {
+        'avg_rating': models.Avg(f'{relation}__rating'),
+        'num_reviews': models.Count(relation),
+    }
+    for star in RATING_STARS:
+        stats[f'num_rating_{star}'] = models.Count(relation, filter=models.Q(**{f'{relation}__rating': star}))
+    return stats
+
+
+class BookQuerySet(ApiQuerySet):
+    api_related = ('author', 'category')
+
+    def with_rating_stats(self):
+        """Annotate avg_rating, num_reviews and num_rating_1..5 from the review table (used to reconcile the stored columns)"""
+        return self.annotate(**_rating_stats('book_reviews'))
+
+
 class Book(models.Model):
     GENRE_CHOICES = [
         ('romance', 'Romance'),
@@ -89,6 +135,7 @@ class Book(models.Model):
         ('adventure', 'Adventure'),
         ('fantasy', 'Fantasy'),
     ]
+    GENRE_LABELS = dict(GENRE_CHOICES)
     
     FILE_TYPE_CHOICES = [
         ('pdf', 'PDF'),
@@ -111,8 +158,20 @@ class Book(models.Model):
     price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     published_year = models.IntegerField(null=True, blank=True)
     is_active = models.BooleanField(default=True, db_index=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Like count
+    comment_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Comment count
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)  # Sum of BookReview ratings
+    rating_count = models.PositiveIntegerField(default=0, editable=False)  # Number of BookReviews
+    average_rating = models.FloatField(default=0, editable=False)  # round(rating_sum / rating_count, 1)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)  # Per-star review counts
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
+    objects = BookQuerySet.as_manager()
+
     class Meta:
         indexes = [
             # Feed query: is_active + created_at DESC (used by raw SQL UNION feed)
@@ -121,6 +180,8 @@ class Book(models.Model):
             models.Index(fields=['genre', 'is_active', '-created_at']),
             models.Index(fields=['category', 'is_active', '-created_at']),
             models.Index(fields=['author', 'is_active', '-created_at']),
+            # Top-rated listing
+            models.Index(fields=['is_active', '-average_rating']),
             # Search support
             models.Index(fields=['title']),
         ]
@@ -128,16 +189,25 @@ class Book(models.Model):
     def __str__(self):
         return self.title
 
-    def average_rating(self):
-        reviews = self.book_reviews.all()
-        if reviews.exists():
-            return round(sum(r.rating for r in reviews) / reviews.count(), 1)
-        return 0
+    @property
+    def genre_display(self):
+        """Returns human-readable genre name"""
+        return self.GENRE_LABELS.get(self.genre, self.genre)
+
+    @property
+    def rating_distribution(self):
+        """Star -> review count from the stored counters"""
+        return {str(star): getattr(self, f'rating_{star}') for star in RATING_STARS}
+
 
-    def review_count(self):
-        return self.book_reviews.count()
 
 
+class PoemQuerySet(ApiQuerySet):
+    api_related = ('author', 'user')
+
+    def with_rating_stats(self):
+        """Annotate avg_rating, num_reviews and num_rating_1..5 from the review table (used to reconcile the stored columns)"""
+        return self.annotate(**_rating_stats('poem_reviews'))
 
 
 class Poem(models.Model):
@@ -160,6 +230,10 @@ class Poem(models.Model):
         ('funny', 'हास्य'),
     ]
     
+    # Built once; the *_display properties below read them for every serialized poem
+    GENRE_LABELS = dict(GENRE_CHOICES)
+    CATEGORY_LABELS = dict(CATEGORY_CHOICES)
+    
     title = models.CharField(max_length=255, db_index=True)
     description = models.TextField(blank=True, null=True, help_text="Short description or summary of the poem")
     content = models.TextField()  # The actual poem text
@@ -171,9 +245,21 @@ class Poem(models.Model):
     background_image_url = models.URLField(blank=True, null=True)  # Optional background image
     is_active = models.BooleanField(default=True)
     is_approved = models.BooleanField(default=True)  # Admin can approve user poems
+    like_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Like count
+    comment_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Comment count
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)  # Sum of PoemReview ratings
+    rating_count = models.PositiveIntegerField(default=0, editable=False)  # Number of PoemReviews
+    average_rating = models.FloatField(default=0, editable=False)  # round(rating_sum / rating_count, 1)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)  # Per-star review counts
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PoemQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -184,6 +270,10 @@ class Poem(models.Model):
             models.Index(fields=['genre', 'is_active', 'is_approved', '-created_at']),
             # User poems query
             models.Index(fields=['user', 'is_active', '-created_at']),
+            # Author page (accounts.works)
+            models.Index(fields=['author', 'is_active', '-created_at']),
+            # Top-rated listing
+            models.Index(fields=['is_active', '-average_rating']),
             # Search support
             models.Index(fields=['title']),
         ]
@@ -202,21 +292,17 @@ class Poem(models.Model):
     @property
     def genre_display(self):
         """Returns human-readable genre name"""
-        return dict(self.GENRE_CHOICES).get(self.genre, self.genre)
+        return self.GENRE_LABELS.get(self.genre, self.genre)
     
     @property
     def category_display(self):
         """Returns human-readable category name"""
-        return dict(self.CATEGORY_CHOICES).get(self.category, self.category)
+        return self.CATEGORY_LABELS.get(self.category, self.category)
 
-    def average_rating(self):
-        reviews = self.poem_reviews.all()
-        if reviews.exists():
-            return round(sum(r.rating for r in reviews) / reviews.count(), 1)
-        return 0
-
-    def review_count(self):
-        return self.poem_reviews.count()
+    @property
+    def rating_distribution(self):
+        """Star -> review count from the stored counters"""
+        return {str(star): getattr(self, f'rating_{star}') for star in RATING_STARS}
 
 
 class BookReview(models.Model):
@@ -288,9 +374,13 @@ class ShortStory(models.Model):
     reading_time = models.IntegerField(default=5, help_text="Estimated reading time in minutes")
     is_active = models.BooleanField(default=True)
     is_approved = models.BooleanField(default=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Like count
+    comment_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Comment count
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ShortStoryQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = "Short Stories"
@@ -301,6 +391,8 @@ class ShortStory(models.Model):
             models.Index(fields=['genre', 'is_active', 'is_approved', '-created_at']),
             # User stories
             models.Index(fields=['user', 'is_active', '-created_at']),
+            # Author page (accounts.works)
+            models.Index(fields=['author', 'is_active', '-created_at']),
             # Search support
             models.Index(fields=['title']),
         ]
@@ -342,9 +434,13 @@ class Audiobook(models.Model):
     is_paid = models.BooleanField(default=False)
     price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Like count
+    comment_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Comment count
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AuthoredQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -352,6 +448,8 @@ class Audiobook(models.Model):
             models.Index(fields=['-created_at', 'is_active']),
             # Filter queries
             models.Index(fields=['genre', 'is_active', '-created_at']),
+            # Author page (accounts.works)
+            models.Index(fields=['author', 'is_active', '-created_at']),
             # Search support
             models.Index(fields=['title']),
         ]
@@ -381,9 +479,13 @@ class Video(models.Model):
     duration = models.IntegerField(default=0, help_text="Duration in minutes")
     language = models.CharField(max_length=50, default="Hindi")
     is_active = models.BooleanField(default=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Like count
+    comment_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Comment count
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AuthoredQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -391,6 +493,8 @@ class Video(models.Model):
             models.Index(fields=['-created_at', 'is_active']),
             # Filter queries
             models.Index(fields=['category', 'is_active', '-created_at']),
+            # Author page (accounts.works)
+            models.Index(fields=['author', 'is_active', '-created_at']),
             # Search support
             models.Index(fields=['title']),
         ]
@@ -420,9 +524,13 @@ class Image(models.Model):
     tags = models.CharField(max_length=255, blank=True, help_text="Comma-separated tags")
     language = models.CharField(max_length=50, default="Hindi")
     is_active = models.BooleanField(default=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Like count
+    comment_count = models.PositiveIntegerField(default=0, editable=False)  # Denormalized Comment count
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AuthoredQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -430,6 +538,8 @@ class Image(models.Model):
             models.Index(fields=['-created_at', 'is_active']),
             # Filter queries
             models.Index(fields=['category', 'is_active', '-created_at']),
+            # Author page (accounts.works)
+            models.Index(fields=['author', 'is_active', '-created_at']),
             # Search support
             models.Index(fields=['title']),
         ]
@@ -438,6 +548,17 @@ class Image(models.Model):
         return self.title
 
 
+# Generic content_type values (Like/Comment/Bookmark/FeedItem) -> content model
+CONTENT_MODELS = {
+    'book': Book,
+    'poem': Poem,
+    'story': ShortStory,
+    'audiobook': Audiobook,
+    'video': Video,
+    'image': Image,
+}
+
+
 class Bookmark(models.Model):
     """Universal Bookmark/Save Later model for all content types"""
     CONTENT_TYPE_CHOICES = [
@@ -454,6 +575,8 @@ class Bookmark(models.Model):
     content_id = models.IntegerField(db_index=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
+    objects = UserActionQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'content_type', 'content_id')
         ordering = ['-created_at']
@@ -483,6 +606,8 @@ class Like(models.Model):
     content_id = models.IntegerField(db_index=True)  # ID of the liked content
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
+    objects = UserActionQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'content_type', 'content_id')  # One like per user per content
         ordering = ['-created_at']
@@ -515,6 +640,8 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = UserActionQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -562,3 +689,39 @@ class Story(models.Model):
 
     def __str__(self):
         return f"Story by {self.user.username} ({self.id})"
+
+
+class FeedItem(models.Model):
+    """Denormalized feed card for one piece of content, kept in sync by accounts.signals"""
+    CONTENT_TYPE_CHOICES = [
+        ('book', 'Book'),
+        ('poem', 'Poem'),
+        ('story', 'Short Story'),
+        ('audiobook', 'Audiobook'),
+        ('video', 'Video'),
+        ('image', 'Image'),
+    ]
+
+    content_type = models.CharField(max_length=20, choices=CONTENT_TYPE_CHOICES)
+    content_id = models.IntegerField()
+    title = models.CharField(max_length=255)
+    author_id = models.IntegerField(null=True, blank=True, db_index=True)  # Author.id, for author renames
+    user_id = models.IntegerField(null=True, blank=True, db_index=True)  # AppUser.id, for user poems/stories
+    author_name = models.CharField(max_length=150, default='Unknown')
+    author_photo = models.URLField(blank=True, null=True)
+    cover_image = models.URLField(blank=True, null=True)
+    description = models.TextField(blank=True, null=True)
+    content = models.TextField(blank=True, null=True)  # Poem text / story excerpt
+    is_visible = models.BooleanField(default=True)  # Active (and approved where applicable)
+    created_at = models.DateTimeField()  # Copied from the content row
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('content_type', 'content_id')
+        indexes = [
+            # Feed query: single range scan in (created_at, type, id) DESC order
+            models.Index(fields=['is_visible', '-created_at', '-content_type', '-content_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type} #{self.content_id}: {self.title}"
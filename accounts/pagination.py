@@ -0,0 +1,180 @@
+"""
+Shared pagination for list endpoints.
+
+Two modes, picked from the query string:
+
+    ?page=2&page_size=20          page-number mode (the default)
+    ?cursor=&page_size=20         keyset mode; follow `next` for further pages
+
+Page size defaults to settings.API_PAGE_SIZE and is capped at
+settings.API_MAX_PAGE_SIZE. Keyset mode never runs OFFSET, and runs COUNT
+only for endpoints that ask for an exact total, so it stays cheap deep into
+a list; page-number mode only counts rows when there is a next page
+(otherwise the total is known from the page itself).
+"""
+import base64
+import json
+from collections import namedtuple
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.response import Response
+
+# items: rows of this page, next: absolute URL of the next page or None,
+# total: number of rows in the whole list (None in keyset mode unless an exact total was asked for)
+Page = namedtuple('Page', 'items next total')
+
+# Headers carrying pagination info for endpoints whose body is a bare list
+PAGINATION_HEADERS = ('Link', 'X-Total-Count')
+
+
+def page_size(params, default=None):
+    """?page_size=, else `default` (settings.API_PAGE_SIZE), capped at settings.API_MAX_PAGE_SIZE"""
+    default = default or settings.API_PAGE_SIZE
+    try:
+        size = int(params.get('page_size') or default)
+    except ValueError:
+        size = default
+    return max(1, min(size, settings.API_MAX_PAGE_SIZE))
+
+
+def page_bounds(params):
+    """(offset, size) of the requested page-number page; ValueError for a bad page"""
+    size = page_size(params)
+    try:
+        number = int(params.get('page', 1))
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise ValueError("page must be a positive integer")
+    return (number - 1) * size, size
+
+
+def limit_offset(params, default=20):
+    """(limit, offset) from ?limit=&offset=, limit capped at settings.API_MAX_PAGE_SIZE; ValueError for bad values"""
+    try:
+        limit = int(params.get('limit', default))
+        offset = int(params.get('offset', 0))
+    except ValueError:
+        raise ValueError("limit and offset must be integers")
+    if limit < 1 or offset < 0:
+        raise ValueError("limit must be positive and offset must not be negative")
+    return min(limit, settings.API_MAX_PAGE_SIZE), offset
+
+
+def _ordering(queryset):
+    """Explicit or Meta ordering plus a pk tiebreaker, so row positions are stable and unique"""
+    ordering = [field for field in (queryset.query.order_by or queryset.model._meta.ordering) if isinstance(field, str)]
+    if not ordering:
+        ordering = ['pk']
+    if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+        ordering.append('-pk' if ordering[0].startswith('-') else 'pk')
+    return ordering
+
+
+def _position(item, ordering):
+    """Values of the ordering columns for a model instance or a .values() row"""
+    names = [field.lstrip('-') for field in ordering]
+    if isinstance(item, dict):
+        return [item[name] for name in names]
+    return [getattr(item, name) for name in names]
+
+
+def _encode_cursor(values):
+    raw = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(token, ordering):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(ordering):
+        return None
+    return values
+
+
+def _after(ordering, values):
+    """Rows strictly after `values` in `ordering`: (a < x) OR (a = x AND b < y) OR ..."""
+    clauses = []
+    equal = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        clauses.append(Q(**equal, **{f'{name}__{lookup}': value}))
+        equal[name] = value
+    return reduce(or_, clauses)
+
+
+def _url(request, **params):
+    query = request.query_params.copy()
+    for name, value in params.items():
+        query[name] = value
+    return request.build_absolute_uri(request.path) + '?' + query.urlencode()
+
+
+def next_page_url(request, offset, size):
+    """URL of the page-number page after the one starting at `offset`"""
+    return _url(request, page=offset // size + 2)
+
+
+def paginate(request, queryset, exact_total=False):
+    """
+    Slice a queryset according to the request's page/cursor parameters.
+
+    With exact_total, keyset pages also carry the total (one COUNT, skipped
+    when the first page holds every row), for endpoints whose body always had it.
+
+    Returns (Page, None), or (None, error message) for a bad page or cursor.
+    Keyset mode orders by the queryset's ordering, which must not contain NULLs;
+    .values() querysets must include the ordering columns and 'pk'.
+    """
+    params = request.query_params
+    size = page_size(params)
+    ordering = _ordering(queryset)
+    queryset = queryset.order_by(*ordering)
+
+    if 'cursor' in params:
+        counted = queryset
+        token = params.get('cursor')
+        if token:
+            values = _decode_cursor(token, ordering)
+            if values is None:
+                return None, "Invalid cursor"
+            queryset = queryset.filter(_after(ordering, values))
+        try:
+            rows = list(queryset[:size + 1])
+        except (ValidationError, ValueError, TypeError):
+            return None, "Invalid cursor"
+        items = rows[:size]
+        next_url = None
+        if len(rows) > size:
+            next_url = _url(request, cursor=_encode_cursor(_position(items[-1], ordering)))
+        total = None
+        if exact_total:
+            total = len(items) if not token and next_url is None else counted.count()
+        return Page(items, next_url, total), None
+
+    try:
+        offset, size = page_bounds(params)
+    except ValueError as e:
+        return None, str(e)
+    rows = list(queryset[offset:offset + size + 1])
+    items = rows[:size]
+    if len(rows) > size:
+        return Page(items, next_page_url(request, offset, size), queryset.count()), None
+    return Page(items, None, offset + len(items) if items or not offset else queryset.count()), None
+
+
+def paginated_response(data, page):
+    """Response for endpoints whose body is a bare list: pagination goes in Link/X-Total-Count headers"""
+    response = Response(data)
+    if page.next:
+        response['Link'] = f'<{page.next}>; rel="next"'
+    if page.total is not None:
+        response['X-Total-Count'] = str(page.total)
+    return response
@@ -0,0 +1,136 @@
+"""
+Per-user cache of liked and bookmarked (content_type, content_id) pairs.
+
+Each set is cached together with the version it was built for. Toggles bump
+the user's version and patch the cached set only when it is exactly one
+version behind; any other mismatch means a concurrent write happened, so the
+set is dropped and reloaded from the database on the next read.
+
+The sets are only cached when all workers share the cache (see
+accounts.cache.cache_is_shared()); otherwise a toggle on one worker would
+go unseen by the others, so lookups query the page's pairs directly.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .cache import cache_is_shared
+from .models import Like, Bookmark
+
+# Short enough that a lost version update (non-atomic incr on the file backend) heals quickly
+USER_SET_TIMEOUT = 5 * 60
+SET_SOURCES = {
+    'likes': Like,
+    'bookmarks': Bookmark,
+}
+
+
+def _set_key(kind, user_id):
+    return f"user:{user_id}:{kind}:set"
+
+
+def _version_key(kind, user_id):
+    return f"user:{user_id}:{kind}:version"
+
+
+def _normalize_user_id(user_id):
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_set(kind, user_id):
+    user_id = _normalize_user_id(user_id)
+    if user_id is None:
+        return frozenset()
+
+    set_key = _set_key(kind, user_id)
+    version_key = _version_key(kind, user_id)
+    found = cache.get_many([set_key, version_key])
+    version = found.get(version_key)
+    if version is None:
+        # Start from the clock so an evicted version never matches an old cached set
+        cache.add(version_key, int(time.time() * 1000), None)
+        version = cache.get(version_key)
+
+    cached = found.get(set_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    keys = frozenset(
+        SET_SOURCES[kind].objects.filter(user_id=user_id)
+        .order_by()
+        .values_list('content_type', 'content_id')
+    )
+    cache.set(set_key, (version, keys), USER_SET_TIMEOUT)
+    return keys
+
+
+def _record(kind, user_id, content_type, content_id, present):
+    user_id = _normalize_user_id(user_id)
+    if user_id is None or not cache_is_shared():
+        return
+
+    set_key = _set_key(kind, user_id)
+    version_key = _version_key(kind, user_id)
+    try:
+        version = cache.incr(version_key)
+    except ValueError:
+        cache.delete(set_key)
+        return
+
+    cached = cache.get(set_key)
+    if cached is None or cached[0] != version - 1:
+        cache.delete(set_key)
+        return
+
+    key = (content_type, int(content_id))
+    keys = cached[1] | {key} if present else cached[1] - {key}
+    cache.set(set_key, (version, keys), USER_SET_TIMEOUT)
+
+
+def pairs_filter(keys):
+    """One OR'ed Q matching every (content_type, content_id) pair, grouped by type"""
+    ids_by_type = {}
+    for content_type, content_id in keys:
+        ids_by_type.setdefault(content_type, set()).add(content_id)
+    condition = Q()
+    for content_type, ids in ids_by_type.items():
+        condition |= Q(content_type=content_type, content_id__in=ids)
+    return condition
+
+
+def _find(kind, user_id, keys):
+    keys = frozenset(keys)
+    user_id = _normalize_user_id(user_id)
+    if user_id is None or not keys:
+        return frozenset()
+    if cache_is_shared():
+        return _get_set(kind, user_id) & keys
+    return frozenset(
+        SET_SOURCES[kind].objects.filter(pairs_filter(keys), user_id=user_id)
+        .order_by()
+        .values_list('content_type', 'content_id')
+    )
+
+
+def find_user_likes(user_id, keys):
+    """The (content_type, content_id) pairs among `keys` the user liked; empty for anonymous"""
+    return _find('likes', user_id, keys)
+
+
+def find_user_bookmarks(user_id, keys):
+    """The (content_type, content_id) pairs among `keys` the user saved; empty for anonymous"""
+    return _find('bookmarks', user_id, keys)
+
+
+def record_like(user_id, content_type, content_id, liked):
+    """Apply a like/unlike to the user's cached set"""
+    _record('likes', user_id, content_type, content_id, liked)
+
+
+def record_bookmark(user_id, content_type, content_id, saved):
+    """Apply a save/unsave to the user's cached set"""
+    _record('bookmarks', user_id, content_type, content_id, saved)
@@ -0,0 +1,84 @@
+"""
+orjson-backed JSON renderer and parser.
+
+Drop-in replacements for DRF's JSONRenderer/JSONParser: select them per view
+(renderer_classes = [ORJSONRenderer]) or globally with API_JSON_BACKEND
+(see backend/settings.py). orjson is pinned in requirements.txt but optional
+at import; without it, and for anything it cannot encode the way DRF does
+(indented output, non-compact or ASCII-only settings, out-of-range integers),
+both classes fall back to DRF's stdlib path.
+"""
+import datetime
+import decimal
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Same output as DRF's encoder: UTC datetimes end in "Z", int dict keys become strings
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """The parts of rest_framework.utils.encoders.JSONEncoder that orjson does not cover natively"""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # Serializers already coerce decimals to strings; bare ones go out as numbers like DRF
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__getitem__'):
+        cls = list if isinstance(obj, (list, tuple)) else dict
+        return cls(obj)
+    if hasattr(obj, '__iter__'):
+        return tuple(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Keep the output a strict JavaScript subset, as DRF does
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
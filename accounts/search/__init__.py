@@ -0,0 +1,61 @@
+"""
+Text search over content lists.
+
+Two engines, picked by settings.SEARCH_BACKEND ('auto' uses PostgreSQL when
+the database is PostgreSQL, the in-process index otherwise):
+
+- 'postgres': Poem, ShortStory and Book carry a `search_vector` tsvector
+  column kept up to date by a trigger (migration 0031) and GIN-indexed, so a
+  search is an index lookup plus ranking of the matching rows.
+- 'inverted': accounts.search.inverted, a BM25 inverted index kept in
+  process (and in a memory-mapped file) and updated from model signals.
+"""
+import re
+import unicodedata
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from ..models import Book, Poem, ShortStory
+
+# Columns searched per model, most important first
+SEARCH_FIELDS = {
+    Poem: ('title', 'description', 'content'),
+    ShortStory: ('title', 'content'),
+    Book: ('title', 'description'),
+}
+
+# Devanagari spelling variants folded before indexing and querying: chandrabindu -> anusvara,
+# nukta and zero-width (non-)joiners dropped. Must match accounts_search_text() in migration 0031.
+_FOLD = str.maketrans({'\u0901': '\u0902', '\u093c': None, '\u200c': None, '\u200d': None})
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """NFKC, Devanagari variant folding and collapsed whitespace"""
+    return _SPACES.sub(' ', unicodedata.normalize('NFKC', text).translate(_FOLD)).strip()
+
+
+def search_backend():
+    """'postgres' or 'inverted', resolving SEARCH_BACKEND='auto' against the database vendor"""
+    backend = settings.SEARCH_BACKEND
+    if backend == 'auto':
+        return 'postgres' if connection.vendor == 'postgresql' else 'inverted'
+    if backend not in ('postgres', 'inverted'):
+        raise ImproperlyConfigured(f"Unknown SEARCH_BACKEND {backend!r}")
+    return backend
+
+
+def search_queryset(queryset, text):
+    """
+    Restrict a queryset to rows matching `text`, annotated with `rank`.
+
+    Rows come best rank first, with pk breaking ties, so page and keyset
+    pagination both work.
+    """
+    if search_backend() == 'postgres':
+        from .postgres import ranked_search
+    else:
+        from .inverted import ranked_search
+    return ranked_search(queryset, normalize_text(text))
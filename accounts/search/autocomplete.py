@@ -0,0 +1,190 @@
+"""
+Prefix autocomplete over titles and author names (GET /api/autocomplete/).
+
+Every visible title of the SEARCH_TYPES in accounts.search.unified (author
+names included) is indexed, folded and lowercased, under the suffixes that
+start at each of its first words ("गोदान पर कविता", "पर कविता", "कविता"), in
+one sorted table: a prefix lookup is a bisect to the first key >= it and a
+scan while keys start with it. The table is memory-mapped from
+settings.AUTOCOMPLETE_INDEX_PATH and shared by all workers (see
+accounts.search.shared), with a small sorted in-memory delta of the titles
+saved since it was written, so a keystroke never touches the database.
+"""
+import heapq
+from array import array
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from . import normalize_text
+from .shared import BYTE_ORDER, SharedIndex, Strings, map_sections, pack_strings, write_sections
+from .unified import SEARCH_TYPES
+
+# Type code = position in SEARCH_TYPES (stored in the file)
+TYPES = tuple(SEARCH_TYPES)
+
+MAX_WORDS = 6  # Keys start at each of a title's first MAX_WORDS words
+KEY_LENGTH = 64  # Characters kept per key; longer prefixes are not worth typing
+MAX_SCAN = 64  # Keys examined per lookup before ranking, however common the prefix
+
+MAGIC = b'MIMAC02' + BYTE_ORDER
+
+
+def fold(text):
+    """Folded, lowercased, single-spaced text, as keys and prefixes are compared"""
+    return ' '.join(normalize_text(text).lower().split())
+
+
+def title_keys(text):
+    """[(word position, key)] a title is found under: the suffixes starting at each of its first words"""
+    words = fold(text).split(' ')
+    keys = {}
+    for position in range(min(len(words), MAX_WORDS)):
+        key = ' '.join(words[position:])[:KEY_LENGTH]
+        if key:
+            keys.setdefault(key, position)
+    return [(position, key) for key, position in keys.items()]
+
+
+class _Segment:
+    """Sorted entries memory-mapped from a file written by AutocompleteIndex.write(), one per key"""
+
+    def __init__(self, path):
+        sections = map_sections(path, MAGIC)
+        self.keys = Strings(sections[0].cast('I'), sections[1])
+        self.codes = sections[2].cast('B')
+        self.ids = sections[3].cast('Q')
+        self.positions = sections[4].cast('B')
+        self.text_ids = sections[5].cast('I')
+        self.texts = Strings(sections[6].cast('I'), sections[7])
+
+
+class AutocompleteIndex:
+    """A segment (optional) plus titles saved since it was written"""
+
+    def __init__(self, segment=None, entries=()):
+        self.segment = segment
+        self.entries = sorted(entries)  # [(key, code, id, word position, text)]
+        self.keys = defaultdict(list)  # (code, id) -> its keys in self.entries
+        for key, code, pk, _, _ in self.entries:
+            self.keys[(code, pk)].append(key)
+        self.hidden = set()  # (code, id) whose segment entries are outdated
+
+    def add(self, code, pk, text):
+        self.remove(code, pk)
+        for position, key in title_keys(text):
+            insort(self.entries, (key, code, pk, position, text))
+            self.keys[(code, pk)].append(key)
+
+    def remove(self, code, pk):
+        self.hidden.add((code, pk))
+        for key in self.keys.pop((code, pk), ()):
+            i = bisect_left(self.entries, (key, code, pk))
+            if i < len(self.entries) and self.entries[i][:3] == (key, code, pk):
+                del self.entries[i]
+
+    def complete(self, prefix, limit=10, codes=None):
+        """
+        Up to `limit` [(code, id, text)] completing `prefix`: titles starting
+        with it first, then titles with a later word starting with it, shorter
+        titles first. At most MAX_SCAN keys are read from the segment and from
+        the delta, and only the returned texts are decoded.
+        """
+        prefix = fold(prefix)[:KEY_LENGTH]
+        if not prefix:
+            return []
+        best = {}  # (code, id) -> ((word position, key bytes), text or segment text id)
+
+        def offer(code, pk, rank, text):
+            if codes is None or code in codes:
+                found = best.get((code, pk))
+                if found is None or rank < found[0]:
+                    best[(code, pk)] = (rank, text)
+
+        segment = self.segment
+        if segment is not None:
+            encoded = prefix.encode()
+            start = bisect_left(segment.keys, encoded)
+            for i in range(start, min(start + MAX_SCAN, len(segment.keys))):
+                key = segment.keys[i]
+                if not key.startswith(encoded):
+                    break
+                code, pk = segment.codes[i], segment.ids[i]
+                if (code, pk) not in self.hidden:
+                    offer(code, pk, (segment.positions[i], len(key)), segment.text_ids[i])
+        start = bisect_left(self.entries, (prefix,))
+        for key, code, pk, position, text in self.entries[start:start + MAX_SCAN]:
+            if not key.startswith(prefix):
+                break
+            offer(code, pk, (position, len(key.encode())), text)
+
+        top = heapq.nsmallest(limit, ((rank, code, pk, text) for (code, pk), (rank, text) in best.items()))
+        return [
+            (code, pk, text if isinstance(text, str) else segment.texts[text].decode())
+            for _, code, pk, text in top
+        ]
+
+    def write(self, path):
+        """Write every current entry as a new segment, atomically replacing `path`"""
+        rows = []
+        segment = self.segment
+        if segment is not None:
+            for i in range(len(segment.keys)):
+                code, pk = segment.codes[i], segment.ids[i]
+                if (code, pk) not in self.hidden:
+                    rows.append((segment.keys[i], code, pk, segment.positions[i], segment.texts[segment.text_ids[i]]))
+        rows.extend((key.encode(), code, pk, position, text.encode()) for key, code, pk, position, text in self.entries)
+        rows.sort()
+        text_ids = {}
+        write_sections(path, MAGIC, [
+            *pack_strings(row[0] for row in rows),
+            array('B', (row[1] for row in rows)),
+            array('Q', (row[2] for row in rows)),
+            array('B', (row[3] for row in rows)),
+            array('I', (text_ids.setdefault(row[4], len(text_ids)) for row in rows)),
+            *pack_strings(text_ids),
+        ])
+
+
+def build_index():
+    """A fresh in-memory index of every visible title and author name"""
+    entries = []
+    for code, (model, visible, column, _) in enumerate(SEARCH_TYPES.values()):
+        rows = model.objects.filter(**visible).order_by().values_list('pk', column)
+        for pk, text in rows.iterator(chunk_size=2000):
+            entries.extend((key, code, pk, position, text) for position, key in title_keys(text))
+    return AutocompleteIndex(entries=entries)
+
+
+def _apply(index, code, pk, text):
+    if text is None:
+        index.remove(code, pk)
+    else:
+        index.add(code, pk, text)
+
+
+_shared = SharedIndex('AUTOCOMPLETE_INDEX_PATH', lambda path: AutocompleteIndex(_Segment(path)), build_index, _apply)
+
+
+def rebuild_index(path=None):
+    """Rebuild from the database (and write it to `path`, default AUTOCOMPLETE_INDEX_PATH)"""
+    return _shared.rebuild(path)
+
+
+def update_title(search_type, instance):
+    """Re-index a saved row (dropping it if no longer visible); written to the file on commit"""
+    _, visible, column, _ = SEARCH_TYPES[search_type]
+    shown = all(getattr(instance, field) == value for field, value in visible.items())
+    _shared.update(TYPES.index(search_type), instance.pk, getattr(instance, column) if shown else None)
+
+
+def remove_title(search_type, pk):
+    _shared.update(TYPES.index(search_type), pk, None)
+
+
+def complete(prefix, limit=10, types=TYPES):
+    """[{type, id, text}] completing `prefix`, from memory"""
+    codes = None if len(types) == len(TYPES) else {TYPES.index(search_type) for search_type in types}
+    return [
+        {'type': TYPES[code], 'id': pk, 'text': text}
+        for code, pk, text in _shared.get().complete(prefix, limit, codes)
+    ]
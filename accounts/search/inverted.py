@@ -0,0 +1,303 @@
+"""
+In-process inverted index: the search backend for databases without
+PostgreSQL full-text search (SEARCH_BACKEND='inverted', or 'auto' off PostgreSQL).
+
+Documents are the SEARCH_FIELDS of Poem, ShortStory and Book. Text is folded
+like on PostgreSQL (normalize_text) and split into words that keep Devanagari
+vowel signs and viramas inside the word. Words are posted to documents and
+character n-grams to words: a query word missing from the index (a typo,
+another inflection) stands for the indexed words closest to it by n-gram
+overlap. Ranking is BM25.
+
+Storage is an immutable segment (sorted word and n-gram tables with
+array-backed postings) memory-mapped from settings.SEARCH_INDEX_PATH, so
+workers share it through the page cache, plus an in-memory delta of
+documents changed since the segment was written. Saves and deletes update the
+delta at once and rewrite the file on commit under a file lock; other workers
+remap it when it changes. Without a path the index lives in memory and is
+built from the database on first use. Queryset.update() bypasses signals: run
+`python manage.py build_search_index` after bulk changes.
+"""
+import heapq
+import math
+import re
+from array import array
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import Case, FloatField, Value, When
+
+from . import SEARCH_FIELDS, normalize_text
+from .shared import BYTE_ORDER, SharedIndex, map_sections, pack_table, unpack_table, write_sections
+
+# Document type code = position in this tuple (stored in the segment file)
+MODELS = tuple(SEARCH_FIELDS)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+TITLE_BOOST = 2  # A title word counts as this many occurrences
+MAX_TF = 0xFFFF  # Term frequencies are stored as unsigned shorts
+
+# Typo tolerance: a query word missing from the index stands for its closest indexed words,
+# by Jaccard similarity of their character n-grams (bigrams: a one-letter slip in a short
+# Devanagari word still leaves most of them intact)
+NGRAM_SIZE = 2
+FUZZY_MIN_SIMILARITY = 0.4
+FUZZY_EXPANSIONS = 3  # Closest words tried per unknown query word
+
+# Letters, digits and the Devanagari block except the dandas (U+0964/U+0965 end sentences).
+# \w alone would split words at vowel signs and viramas.
+_WORD = re.compile(r'[\w\u0900-\u0963\u0966-\u097f]+')
+
+MAGIC = b'MIMIDX2' + BYTE_ORDER
+
+
+def tokenize(text):
+    """Folded, lowercased words of `text`"""
+    return _WORD.findall(normalize_text(text).lower())
+
+
+def ngrams(word):
+    """Character n-grams of a word, padded so its first and last letters get their own"""
+    padded = f' {word} '
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def document_terms(texts):
+    """({word: frequency}, length) for a document's field values, title first"""
+    words = Counter()
+    for position, text in enumerate(texts):
+        tokens = tokenize(text or '')
+        words.update(tokens * TITLE_BOOST if position == 0 else tokens)
+    return words, sum(words.values())
+
+
+class _Segment:
+    """
+    Read-only index segment, memory-mapped from a file written by InvertedIndex.write().
+
+    terms: word -> postings (doc ids, frequencies); grams: n-gram -> positions
+    of the words containing it in `terms`.
+    """
+
+    def __init__(self, path):
+        sections = map_sections(path, MAGIC)
+        self.doc_types = sections[0].cast('B')
+        self.doc_pks = sections[1].cast('Q')
+        self.doc_lens = sections[2].cast('I')
+        self.n_docs = len(self.doc_pks)
+        self.terms = unpack_table(sections[3:8], 'I', 'H')
+        self.grams = unpack_table(sections[8:12], 'I')
+
+
+class InvertedIndex:
+    """A segment (optional) plus in-memory additions and deletions"""
+
+    def __init__(self, segment=None):
+        self.segment = segment
+        self.base_docs = segment.n_docs if segment else 0
+        # Documents added since the segment: ids continue after base_docs
+        self.doc_types = array('B')
+        self.doc_pks = array('Q')
+        self.doc_lens = array('I')
+        self.postings = {}  # word -> (array of doc ids, array of frequencies), added documents only
+        self.gram_words = defaultdict(set)  # n-gram -> words not in the segment that contain it
+        self.deleted = set()
+        self.live = self.base_docs
+        self.total_length = sum(segment.doc_lens) if segment else 0
+        self._docs = None  # (type code, pk) -> live doc id, built on the first change
+
+    def _key(self, doc):
+        if doc < self.base_docs:
+            return self.segment.doc_types[doc], self.segment.doc_pks[doc]
+        doc -= self.base_docs
+        return self.doc_types[doc], self.doc_pks[doc]
+
+    def _length(self, doc):
+        if doc < self.base_docs:
+            return self.segment.doc_lens[doc]
+        return self.doc_lens[doc - self.base_docs]
+
+    @property
+    def docs(self):
+        if self._docs is None:
+            self._docs = {
+                self._key(doc): doc
+                for doc in range(self.base_docs + len(self.doc_pks)) if doc not in self.deleted
+            }
+        return self._docs
+
+    def add(self, code, pk, texts):
+        """Index (or re-index) a document from its field values"""
+        self.remove(code, pk)
+        words, length = document_terms(texts)
+        doc = self.base_docs + len(self.doc_pks)
+        self.doc_types.append(code)
+        self.doc_pks.append(pk)
+        self.doc_lens.append(length)
+        postings = self.postings
+        for word, frequency in words.items():
+            entry = postings.get(word)
+            if entry is None:
+                entry = postings[word] = (array('I'), array('H'))
+                if self.segment is None or self.segment.terms.find(word) < 0:
+                    for gram in ngrams(word):
+                        self.gram_words[gram].add(word)
+            entry[0].append(doc)
+            entry[1].append(frequency if frequency < MAX_TF else MAX_TF)
+        self.docs[(code, pk)] = doc
+        self.live += 1
+        self.total_length += length
+
+    def remove(self, code, pk):
+        doc = self.docs.pop((code, pk), None)
+        if doc is not None:
+            self.deleted.add(doc)
+            self.live -= 1
+            self.total_length -= self._length(doc)
+
+    def _postings(self, word):
+        found = []
+        if self.segment is not None:
+            i = self.segment.terms.find(word)
+            if i >= 0:
+                found.append(self.segment.terms.slices(i))
+        if word in self.postings:
+            found.append(self.postings[word])
+        return found
+
+    def _similar_words(self, word):
+        """Up to FUZZY_EXPANSIONS [(similarity, indexed word)] closest to `word`"""
+        grams = ngrams(word)
+        base, added = Counter(), Counter()  # Shared n-grams per segment word position / added word
+        for gram in grams:
+            if self.segment is not None:
+                i = self.segment.grams.find(gram)
+                if i >= 0:
+                    base.update(self.segment.grams.slices(i)[0])
+            added.update(self.gram_words.get(gram, ()))
+        # similarity <= shared / len(grams): skip decoding words that cannot reach the minimum
+        needed = FUZZY_MIN_SIMILARITY * len(grams)
+        candidates = []
+        for counts, decode in ((base, lambda i: self.segment.terms.keys[i].decode()), (added, str)):
+            for key, shared in counts.items():
+                if shared >= needed:
+                    candidate = decode(key)
+                    similarity = shared / (len(grams) + len(ngrams(candidate)) - shared)
+                    if similarity >= FUZZY_MIN_SIMILARITY:
+                        candidates.append((similarity, candidate))
+        return heapq.nlargest(FUZZY_EXPANSIONS, candidates)
+
+    def _score(self, postings, weight, avgdl, scores):
+        """Add one word's BM25 contribution, times `weight`, to `scores`"""
+        df = sum(len(docs) for docs, _ in postings)
+        idf = math.log(1 + (self.live - df + 0.5) / (df + 0.5))
+        for docs, frequencies in postings:
+            for doc, tf in zip(docs, frequencies):
+                norm = K1 * (1 - B + B * self._length(doc) / avgdl)
+                scores[doc] += weight * idf * tf * (K1 + 1) / (tf + norm)
+
+    def search(self, text, codes=None, limit=100):
+        """Best `limit` [(score, type code, pk)] for `text`, optionally only documents of `codes`"""
+        words = tokenize(text)
+        if not words or not self.live:
+            return []
+        avgdl = self.total_length / self.live or 1
+        scores = defaultdict(float)
+        for word in dict.fromkeys(words):
+            postings = self._postings(word)
+            if postings:
+                self._score(postings, 1.0, avgdl, scores)
+                continue
+            # Unknown word (typo, other spelling): its closest indexed words, weighted by similarity
+            for similarity, candidate in self._similar_words(word):
+                self._score(self._postings(candidate), similarity, avgdl, scores)
+        hits = []
+        for doc, score in scores.items():
+            if doc in self.deleted:
+                continue
+            code, pk = self._key(doc)
+            if codes is None or code in codes:
+                hits.append((score, code, pk))
+        return heapq.nlargest(limit, hits)
+
+    def write(self, path):
+        """Write the live documents as a compacted segment, atomically replacing `path`"""
+        total_docs = self.base_docs + len(self.doc_pks)
+        renumber = array('i', [-1]) * total_docs
+        doc_types, doc_pks, doc_lens = array('B'), array('Q'), array('I')
+        for doc in range(total_docs):
+            if doc not in self.deleted:
+                renumber[doc] = len(doc_pks)
+                code, pk = self._key(doc)
+                doc_types.append(code)
+                doc_pks.append(pk)
+                doc_lens.append(self._length(doc))
+
+        words = set(self.postings)
+        if self.segment is not None:
+            words.update(key.decode() for key in self.segment.terms.keys)
+        terms = []
+        grams = defaultdict(list)
+        for word in sorted(words):  # Code point order is UTF-8 byte order, which _Table.find() expects
+            docs, frequencies = array('I'), array('H')
+            for old_docs, old_frequencies in self._postings(word):
+                for doc, tf in zip(old_docs, old_frequencies):
+                    if renumber[doc] >= 0:
+                        docs.append(renumber[doc])
+                        frequencies.append(tf)
+            if docs:  # Otherwise only deleted documents had it
+                for gram in ngrams(word):
+                    grams[gram].append(len(terms))
+                terms.append((word, (docs, frequencies)))
+
+        write_sections(path, MAGIC, [
+            doc_types, doc_pks, doc_lens,
+            *pack_table(terms, 'I', 'H'),
+            *pack_table(((gram, (grams[gram],)) for gram in sorted(grams)), 'I'),
+        ])
+
+
+def build_index():
+    """A fresh in-memory index of every searchable row"""
+    index = InvertedIndex()
+    for code, model in enumerate(MODELS):
+        for pk, *texts in model.objects.order_by().values_list('pk', *SEARCH_FIELDS[model]).iterator(chunk_size=1000):
+            index.add(code, pk, texts)
+    return index
+
+
+def _apply(index, code, pk, texts):
+    if texts is None:
+        index.remove(code, pk)
+    else:
+        index.add(code, pk, texts)
+
+
+_shared = SharedIndex('SEARCH_INDEX_PATH', lambda path: InvertedIndex(_Segment(path)), build_index, _apply)
+
+
+def get_index():
+    """This process's index, in sync with SEARCH_INDEX_PATH"""
+    return _shared.get()
+
+
+def rebuild_index(path=None):
+    """Rebuild the index from the database (and write it to `path`, default SEARCH_INDEX_PATH)"""
+    return _shared.rebuild(path)
+
+
+def update_document(model, pk, texts=None):
+    """Index a saved row's field values (texts) or drop a deleted row (None); written to the file on commit"""
+    _shared.update(MODELS.index(model), pk, texts)
+
+
+def ranked_search(queryset, text):
+    """Rows of the queryset's model matching `text`, annotated with their BM25 `rank`, best first"""
+    hits = get_index().search(text, codes={MODELS.index(queryset.model)}, limit=settings.SEARCH_MAX_RESULTS)
+    if not hits:
+        return queryset.none()
+    rank = Case(*[When(pk=pk, then=Value(score)) for score, _, pk in hits], output_field=FloatField())
+    return queryset.filter(pk__in=[pk for _, _, pk in hits]).annotate(rank=rank).order_by('-rank', '-pk')
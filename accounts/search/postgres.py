@@ -0,0 +1,64 @@
+"""
+PostgreSQL search: ranked full-text search on the trigger-maintained
+`search_vector` columns, and pg_trgm fuzzy matching on titles and names.
+
+search_vector is not a model field (Django never reads or writes it), so it
+is referenced here by SQL; its GIN index serves the @@ match. The trigram GIN
+indexes are on accounts_search_text(column), so queries must use the same
+expression (folded()) to hit them.
+"""
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, Func, TextField, Value
+from django.db.models.expressions import RawSQL
+
+# 'simple' only lowercases: no English stemming or stop words mangling Hindi text
+SEARCH_CONFIG = 'simple'
+
+# ts_rank normalization: divide by 1 + log(document length) so long stories don't win on bulk
+RANK_NORMALIZATION = 1
+
+
+def search_vector(model):
+    """Expression for a model's search_vector column"""
+    return RawSQL(f'"{model._meta.db_table}"."search_vector"', [], output_field=SearchVectorField())
+
+
+def ranked_search(queryset, text):
+    """Rows whose search_vector matches `text` (web search syntax), best rank first"""
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    vector = search_vector(queryset.model)
+    return (
+        queryset
+        .alias(document=vector)
+        .filter(document=query)
+        .annotate(rank=SearchRank(vector, query, normalization=RANK_NORMALIZATION))
+        .order_by('-rank', '-pk')
+    )
+
+
+def folded(column):
+    """accounts_search_text(column): the expression the trigram indexes of migration 0032 are built on"""
+    return Func(F(column), function='accounts_search_text', output_field=TextField())
+
+
+def set_trigram_threshold(threshold):
+    """
+    Set the word similarity threshold of the <% operator until the current
+    transaction ends (is_local, so it never leaks onto a pooled connection).
+    Call it inside transaction.atomic(), once before any trigram_search().
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(threshold)])
+
+
+def trigram_search(queryset, column, text):
+    """Rows with a word in `column` within the set_trigram_threshold() of `text`, most similar first"""
+    expression = folded(column)
+    return (
+        queryset
+        .filter(TrigramWordSimilar(expression, Value(text)))
+        .annotate(score=TrigramWordSimilarity(Value(text), expression))
+        .order_by('-score', '-pk')
+    )
@@ -0,0 +1,307 @@
+"""
+Building blocks for the in-process search structures (accounts.search.inverted,
+accounts.search.autocomplete): array sections in a memory-mapped file, sorted
+string tables over them, and a per-process handle that keeps an index in sync
+with the file every worker shares.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no lock needed
+    fcntl = None
+
+# Arrays are written in native byte order; the marker keeps a file from being read on another platform
+BYTE_ORDER = b'L' if sys.byteorder == 'little' else b'B'
+
+_PREFIX = struct.Struct('=8sI')  # magic, number of sections
+
+# Journal size past which a SharedIndex folds it into a new file
+JOURNAL_COMPACT_BYTES = 1 << 20
+
+
+def write_sections(path, magic, sections):
+    """Write arrays (8-byte aligned, for memoryview casts) after a header, atomically replacing `path`"""
+    header = struct.Struct(f'=8sI{2 * len(sections)}Q')
+    offsets = []
+    position = header.size
+    for data in sections:
+        position = (position + 7) & ~7
+        offsets.append(position)
+        position += len(data) * data.itemsize
+    sizes = [len(data) * data.itemsize for data in sections]
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header.pack(magic, len(sections), *offsets, *sizes))
+        for offset, data in zip(offsets, sections):
+            f.write(b'\0' * (offset - f.tell()))
+            data.tofile(f)
+    os.replace(tmp, path)
+
+
+def map_sections(path, magic):
+    """Byte memoryviews of the sections of a file written by write_sections(), memory-mapped read-only"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    found, count = _PREFIX.unpack_from(view)
+    if found != magic:
+        raise ValueError(f"{path} is not a {magic!r} file for this version and platform")
+    positions = struct.unpack_from(f'={2 * count}Q', view, _PREFIX.size)
+    return [view[offset:offset + size] for offset, size in zip(positions[:count], positions[count:])]
+
+
+class Strings:
+    """Sequence of UTF-8 byte strings stored as one blob plus end offsets"""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+
+class Table:
+    """Sorted unique keys (Strings), each owning a slice of one or more parallel value arrays"""
+
+    def __init__(self, keys, value_offsets, *values):
+        self.keys = keys
+        self.value_offsets = value_offsets
+        self.values = values
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, key):
+        """Position of `key` (a str), or -1"""
+        key = key.encode()
+        i = bisect_left(self.keys, key)
+        return i if i < len(self.keys) and self.keys[i] == key else -1
+
+    def slices(self, i):
+        start, end = self.value_offsets[i], self.value_offsets[i + 1]
+        return tuple(values[start:end] for values in self.values)
+
+
+def pack_strings(strings):
+    """Sections of a Strings holding `strings` (str or UTF-8 bytes): [offsets, blob]"""
+    blob = bytearray()
+    offsets = array('I', [0])
+    for string in strings:
+        blob += string if isinstance(string, bytes) else string.encode()
+        offsets.append(len(blob))
+    return [offsets, array('B', blob)]
+
+
+def pack_table(items, *typecodes):
+    """Sections of a Table for [(key, (value sequence, ...))] in key order"""
+    items = list(items)
+    value_offsets = array('Q', [0])
+    values = [array(typecode) for typecode in typecodes]
+    for _, columns in items:
+        for target, column in zip(values, columns):
+            target.extend(column)
+        value_offsets.append(len(values[0]))
+    return [*pack_strings(key for key, _ in items), value_offsets, *values]
+
+
+def unpack_table(sections, *typecodes):
+    """Table over the sections written by pack_table()"""
+    key_offsets, blob, value_offsets, *values = sections
+    return Table(
+        Strings(key_offsets.cast('I'), blob),
+        value_offsets.cast('Q'),
+        *(section.cast(typecode) for section, typecode in zip(values, typecodes)),
+    )
+
+
+class SharedIndex:
+    """
+    This process's copy of an index that all workers share through a file.
+
+    The index object needs write(path); `load(path)` maps a written file,
+    `build()` makes a fresh index from the database and `apply(index, *change)`
+    applies one change (a JSON-able tuple). Changes wait for their transaction
+    to commit (a rollback drops them), then are appended to a journal next to
+    the file (`<path>.journal`) under a lock; every worker, this one included,
+    applies the journal lines it has not read yet on top of the mapped file,
+    and remaps when the file is replaced. Once the
+    journal passes JOURNAL_COMPACT_BYTES a background thread folds it into a
+    new file (so does `manage.py build_search_index`); saves never rewrite the
+    whole index. With no path configured (settings.<path_setting> empty) the
+    index is per process only.
+    """
+
+    def __init__(self, path_setting, load, build, apply):
+        self.path_setting = path_setting
+        self.load = load
+        self.build = build
+        self.apply = apply
+        self._lock = threading.RLock()
+        self._index = None
+        self._loaded = None  # Version of the file _index was mapped from
+        self._journal = None  # Inode of the journal _index has read...
+        self._offset = 0  # ...and up to which byte
+
+    @property
+    def path(self):
+        return getattr(settings, self.path_setting)
+
+    @staticmethod
+    def _version(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+    @staticmethod
+    def _journal_stat(path):
+        try:
+            return os.stat(f'{path}.journal')
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _read_journal(path, inode, offset):
+        """Complete lines of the journal from `offset` on, as (changes, bytes read); none if it was replaced"""
+        try:
+            f = open(f'{path}.journal', 'rb')
+        except FileNotFoundError:
+            return [], 0
+        with f:
+            if os.fstat(f.fileno()).st_ino != inode:
+                return [], 0
+            f.seek(offset)
+            data = f.read()
+        data = data[:data.rfind(b'\n') + 1]  # A writer may be mid-line
+        return [json.loads(line) for line in data.splitlines()], len(data)
+
+    @staticmethod
+    @contextmanager
+    def _file_lock(path, name='lock', blocking=True):
+        """Hold an exclusive lock on `<path>.<name>`; yields False if not blocking and someone else holds it"""
+        with open(f'{path}.{name}', 'w') as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    yield False
+                    return
+            yield True  # Released when the file is closed
+
+    def _sync(self, path):
+        """Bring _index up to date: remap the file if it was replaced, then apply unread journal lines"""
+        version = self._version(path)
+        journal = self._journal_stat(path)
+        inode = journal.st_ino if journal else None
+        if self._index is None or version != self._loaded or inode != self._journal:
+            try:
+                self._index = self.load(path)
+            except (OSError, ValueError):
+                self.rebuild(path)
+                return
+            self._loaded, self._journal, self._offset = version, inode, 0
+        elif journal is None or journal.st_size <= self._offset:
+            return
+        changes, size = self._read_journal(path, inode, self._offset)
+        self._offset += size
+        for change in changes:
+            self.apply(self._index, *change)
+
+    def get(self):
+        """The current index: caught up with the shared file and journal, built on first use"""
+        path = self.path
+        with self._lock:
+            if path:
+                self._sync(path)
+            elif self._index is None:
+                self._index = self.build()
+            return self._index
+
+    def rebuild(self, path=None):
+        """Rebuild from the database (and write it to `path`, default the configured path, emptying its journal)"""
+        path = path or self.path
+        with self._lock:
+            index = self.build()
+            if path:
+                with self._file_lock(path):
+                    index.write(path)
+                    self._replace_journal(path, b'')
+                self._index = None
+                self._sync(path)
+                return self._index
+            self._index = index
+            return index
+
+    @staticmethod
+    def _replace_journal(path, data):
+        """Swap in a new journal file (a new inode, so every worker notices and remaps)"""
+        tmp = f'{path}.journal.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, f'{path}.journal')
+
+    def update(self, *change):
+        """Apply a change once the current transaction commits (at once outside one)"""
+        transaction.on_commit(lambda: self._commit(change))
+
+    def _commit(self, change):
+        path = self.path
+        if not path:
+            with self._lock:
+                if self._index is not None:  # Else the first get() builds an index that has it
+                    self.apply(self._index, *change)
+            return
+        # This process reads it back from the journal on its next get(), like every other worker
+        with self._file_lock(path):
+            with open(f'{path}.journal', 'ab') as f:
+                f.write(json.dumps(change).encode() + b'\n')
+                size = f.tell()
+        if size > JOURNAL_COMPACT_BYTES:
+            threading.Thread(target=self.compact, args=(path,), daemon=True).start()
+
+    def compact(self, path=None):
+        """
+        Fold the journal into a new file. The slow write of the whole index
+        runs on a private copy with no lock held; only the swap is locked,
+        and journal lines appended meanwhile move to the new journal.
+        """
+        path = path or self.path
+        with self._file_lock(path, 'compact', blocking=False) as acquired:
+            if not acquired:
+                return  # Another worker is compacting
+            with self._file_lock(path):
+                journal = self._journal_stat(path)
+                if journal is None:
+                    return
+                index = self.load(path)
+                changes, offset = self._read_journal(path, journal.st_ino, 0)
+            for change in changes:
+                self.apply(index, *change)
+            tmp = f'{path}.compact'
+            index.write(tmp)
+            with self._file_lock(path):
+                if getattr(self._journal_stat(path), 'st_ino', None) != journal.st_ino:
+                    os.remove(tmp)  # Rebuilt meanwhile
+                    return
+                with open(f'{path}.journal', 'rb') as f:
+                    f.seek(offset)
+                    rest = f.read()
+                os.replace(tmp, path)
+                self._replace_journal(path, rest)
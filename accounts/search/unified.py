@@ -0,0 +1,116 @@
+"""
+Cross-content search behind /api/search/.
+
+Every type runs its own LIMIT query over its title (or name) column, most
+similar first; on PostgreSQL that is a pg_trgm word-similarity match served by
+the GIN index from migration 0032, so typos still match. The sorted per-type
+hits are then k-way merged by score, like the feed's 'merge' engine.
+"""
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+from ..models import Audiobook, Author, Book, Image, Poem, ShortStory, Video
+from . import normalize_text
+
+# Columns every search hit carries, in response order
+HIT_COLUMNS = ('type', 'id', 'title', 'author_name', 'author_photo', 'cover_image', 'created_at', 'score')
+
+_UNKNOWN = Value('Unknown')
+
+# type -> (model, visibility filter, searched column, {hit column: expression})
+SEARCH_TYPES = {
+    'book': (Book, {'is_active': True}, 'title', {
+        'author_name': Coalesce('author__name', _UNKNOWN),
+        'author_photo': F('author__photo_url'),
+        'cover_image': F('cover_image_url'),
+    }),
+    'poem': (Poem, {'is_active': True, 'is_approved': True}, 'title', {
+        'author_name': Coalesce('author__name', 'user__username', _UNKNOWN),
+        'author_photo': Coalesce('author__photo_url', 'user__profile_photo'),
+        'cover_image': F('background_image_url'),
+    }),
+    'story': (ShortStory, {'is_active': True, 'is_approved': True}, 'title', {
+        'author_name': Coalesce('author__name', 'user__username', _UNKNOWN),
+        'author_photo': Coalesce('author__photo_url', 'user__profile_photo'),
+        'cover_image': F('cover_image_url'),
+    }),
+    'audiobook': (Audiobook, {'is_active': True}, 'title', {
+        'author_name': Coalesce('author__name', _UNKNOWN),
+        'author_photo': F('author__photo_url'),
+        'cover_image': F('cover_image_url'),
+    }),
+    'video': (Video, {'is_active': True}, 'title', {
+        'author_name': Coalesce('author__name', _UNKNOWN),
+        'author_photo': F('author__photo_url'),
+        'cover_image': F('thumbnail_url'),
+    }),
+    'image': (Image, {'is_active': True}, 'title', {
+        'author_name': Coalesce('author__name', _UNKNOWN),
+        'author_photo': F('author__photo_url'),
+        'cover_image': F('image_url'),
+    }),
+    'author': (Author, {}, 'name', {
+        'title': F('name'),
+        'author_name': F('name'),
+        'author_photo': F('photo_url'),
+        'cover_image': F('photo_url'),
+    }),
+}
+
+
+def parse_search_types(value):
+    """Parse a ?types=poem,author value into a tuple in SEARCH_TYPES order (all types when empty)"""
+    if not value:
+        return tuple(SEARCH_TYPES)
+    requested = {part.strip() for part in value.split(',') if part.strip()}
+    unknown = requested.difference(SEARCH_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown search type(s): {', '.join(sorted(unknown))}")
+    return tuple(search_type for search_type in SEARCH_TYPES if search_type in requested) or tuple(SEARCH_TYPES)
+
+
+def _branch(search_type, text, limit):
+    """The `limit` best hits of one type, best first"""
+    model, visible, column, columns = SEARCH_TYPES[search_type]
+    queryset = model.objects.filter(**visible)
+    if connection.vendor == 'postgresql':
+        from .postgres import trigram_search
+        queryset = trigram_search(queryset, column, text)
+        rows = list(queryset.values('id', 'created_at', 'score', column, **columns)[:limit])
+    else:
+        # No pg_trgm: plain substring match, closer-length titles first
+        rows = list(queryset.filter(**{f'{column}__icontains': text}).values('id', 'created_at', column, **columns))
+        for row in rows:
+            row['score'] = len(text) / max(len(row[column]), len(text))
+        rows = sorted(rows, key=lambda row: (row['score'], row['id']), reverse=True)[:limit]
+    hits = []
+    for row in rows:
+        row['type'] = search_type
+        row.setdefault('title', row[column])
+        hits.append({name: row[name] for name in HIT_COLUMNS})
+    return hits
+
+
+def _hit_sort_key(hit):
+    return hit['score'], hit['type'], hit['id']
+
+
+def search_all(text, types, offset, limit):
+    """Hits offset..offset+limit of the merged ranking, each type's query capped at offset+limit rows"""
+    text = normalize_text(text)
+    branch_limit = offset + limit
+    if connection.vendor == 'postgresql':
+        from .postgres import set_trigram_threshold
+        # One transaction-local threshold for every type's query
+        with transaction.atomic():
+            set_trigram_threshold(settings.SEARCH_TRIGRAM_THRESHOLD)
+            branches = [_branch(search_type, text, branch_limit) for search_type in types]
+    else:
+        branches = [_branch(search_type, text, branch_limit) for search_type in types]
+    merged = heapq.merge(*branches, key=_hit_sort_key, reverse=True)
+    return list(islice(merged, offset, offset + limit))
@@ -1,7 +1,73 @@
+from functools import lru_cache
+
 from rest_framework import serializers
-from .models import AppUser, Category, Author, Book, Poem, BookReview, PoemReview
+from .models import AppUser, Category, Author, Book, Poem, BookReview, PoemReview, RATING_STAR_FIELDS
 from django.contrib.auth.hashers import make_password
 
+
+class SparseFieldsMixin:
+    """
+    Lets a serializer render a subset of its fields: Serializer(obj, fields=[...]).
+
+    CARD_FIELDS is the compact projection list endpoints use by default (None = all
+    fields), and FIELD_SOURCES maps non-column fields to the model columns they read,
+    so project() can push a field selection down into .only()/select_related().
+    """
+    CARD_FIELDS = None
+    FIELD_SOURCES = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+@lru_cache(maxsize=None)
+def serializer_fields(serializer_class):
+    return tuple(serializer_class().fields)
+
+
+def _field_list(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def select_fields(params, serializer_class):
+    """
+    Fields a list request renders: ?fields=a,b (or ?fields=all) and ?exclude=c applied on
+    top of the serializer's CARD_FIELDS. Returns (fields, None) with fields=None meaning
+    every field, or (None, error message) for unknown names.
+    """
+    available = serializer_fields(serializer_class)
+    requested = _field_list(params.get('fields'))
+    excluded = _field_list(params.get('exclude'))
+    if requested == ['all']:
+        requested = list(available)
+    unknown = [name for name in requested + excluded if name not in available]
+    if unknown:
+        return None, f"Unknown field(s): {', '.join(unknown)}"
+
+    fields = [name for name in requested or serializer_class.CARD_FIELDS or available if name not in excluded]
+    if len(fields) == len(available):
+        return None, None
+    return fields, None
+
+
+def project(queryset, serializer_class, fields):
+    """Load only the columns (and joins) needed to render `fields`, plus the ordering columns"""
+    if fields is None:
+        return queryset
+    columns = set()
+    for name in fields:
+        columns.update(serializer_class.FIELD_SOURCES.get(name, (name,)))
+    for field in queryset.query.order_by or queryset.model._meta.ordering:
+        name = field.lstrip('-') if isinstance(field, str) else None
+        if name and name != 'pk' and name not in queryset.query.annotations:
+            columns.add(name)
+    related = {column.split('__', 1)[0] for column in columns if '__' in column}
+    return queryset.select_related(None).select_related(*related).only(*columns)
+
+
 class AppUserRegisterSerializer(serializers.ModelSerializer):
     class Meta:
         model = AppUser
@@ -33,39 +99,59 @@ class AuthorSerializer(serializers.ModelSerializer):
         model = Author
         fields = "__all__"
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    FIELD_SOURCES = {
+        'author_name': ('author__name',),
+        'category_name': ('category__name',),
+        'genre_display': ('genre',),
+        'review_count': ('rating_count',),
+        'rating_distribution': RATING_STAR_FIELDS,
+    }
+
     author_name = serializers.CharField(source="author.name", read_only=True)
     category_name = serializers.CharField(source="category.name", read_only=True)
-    genre_display = serializers.CharField(source="get_genre_display", read_only=True)
-    average_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    genre_display = serializers.CharField(read_only=True)
+    review_count = serializers.IntegerField(source="rating_count", read_only=True)
+    rating_distribution = serializers.ReadOnlyField()
     
     class Meta:
         model = Book
-        fields = "__all__"
-    
-    def get_average_rating(self, obj):
-        return obj.average_rating()
-    
-    def get_review_count(self, obj):
-        return obj.review_count()
+        exclude = RATING_STAR_FIELDS  # Exposed together as rating_distribution
+
+
+
+
+class PoemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Lists leave out the poem text and raw rating columns
+    CARD_FIELDS = (
+        'id', 'title', 'description', 'author', 'user', 'author_name', 'author_photo', 'user_name',
+        'is_user_poem', 'category', 'category_display', 'genre', 'genre_display', 'language',
+        'background_image_url', 'like_count', 'comment_count', 'average_rating', 'review_count',
+        'created_at',
+    )
+    FIELD_SOURCES = {
+        'author_name': ('author__name', 'user__username'),
+        'author_photo': ('author__photo_url', 'user__profile_photo'),
+        'user_name': ('user__username',),
+        'is_user_poem': ('user__id',),
+        'category_display': ('category',),
+        'genre_display': ('genre',),
+        'review_count': ('rating_count',),
+        'rating_distribution': RATING_STAR_FIELDS,
+    }
 
-
-
-
-class PoemSerializer(serializers.ModelSerializer):
     author_name = serializers.SerializerMethodField()
     author_photo = serializers.SerializerMethodField()
     category_display = serializers.ReadOnlyField()
     genre_display = serializers.ReadOnlyField()
-    average_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    review_count = serializers.IntegerField(source="rating_count", read_only=True)
+    rating_distribution = serializers.ReadOnlyField()
     user_name = serializers.CharField(source="user.username", read_only=True)
     is_user_poem = serializers.SerializerMethodField()
     
     class Meta:
         model = Poem
-        fields = "__all__"
+        exclude = RATING_STAR_FIELDS  # Exposed together as rating_distribution
     
     def get_author_name(self, obj):
         return obj.get_author_name()
@@ -79,12 +165,6 @@ class PoemSerializer(serializers.ModelSerializer):
     
     def get_is_user_poem(self, obj):
         return obj.user is not None
-    
-    def get_average_rating(self, obj):
-        return obj.average_rating()
-    
-    def get_review_count(self, obj):
-        return obj.review_count()
 
 
 
@@ -112,7 +192,20 @@ class PoemReviewSerializer(serializers.ModelSerializer):
 
 from .models import ShortStory, Audiobook, Video
 
-class ShortStorySerializer(serializers.ModelSerializer):
+class ShortStorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Lists leave out the story text
+    CARD_FIELDS = (
+        'id', 'title', 'author', 'user', 'author_name', 'author_photo', 'user_name', 'is_user_story',
+        'genre', 'language', 'cover_image_url', 'reading_time', 'like_count', 'comment_count',
+        'created_at',
+    )
+    FIELD_SOURCES = {
+        'author_name': ('author__name', 'user__username'),
+        'author_photo': ('author__photo_url', 'user__profile_photo'),
+        'user_name': ('user__username',),
+        'is_user_story': ('user__id',),
+    }
+
     author_name = serializers.SerializerMethodField()
     author_photo = serializers.SerializerMethodField()
     is_user_story = serializers.SerializerMethodField()
@@ -136,7 +229,11 @@ class ShortStorySerializer(serializers.ModelSerializer):
         return obj.user is not None
 
 
-class AudiobookSerializer(serializers.ModelSerializer):
+class AudiobookSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    FIELD_SOURCES = {
+        'author_name': ('author__name',),
+        'author_photo': ('author__photo_url',),
+    }
     author_name = serializers.CharField(source="author.name", read_only=True)
     author_photo = serializers.URLField(source="author.photo_url", read_only=True)
     
@@ -145,7 +242,11 @@ class AudiobookSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class VideoSerializer(serializers.ModelSerializer):
+class VideoSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    FIELD_SOURCES = {
+        'author_name': ('author__name',),
+        'author_photo': ('author__photo_url',),
+    }
     author_name = serializers.CharField(source="author.name", read_only=True)
     author_photo = serializers.URLField(source="author.photo_url", read_only=True)
     
@@ -157,7 +258,11 @@ class VideoSerializer(serializers.ModelSerializer):
 
 from .models import Image
 
-class ImageSerializer(serializers.ModelSerializer):
+class ImageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    FIELD_SOURCES = {
+        'author_name': ('author__name',),
+        'author_photo': ('author__photo_url',),
+    }
     author_name = serializers.CharField(source="author.name", read_only=True)
     author_photo = serializers.URLField(source="author.photo_url", read_only=True)
     
@@ -0,0 +1,112 @@
+"""
+Signal handlers that keep denormalized data in sync with the content tables.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import CACHE_NAMESPACES, bump_generation
+from .feed import adjust_feed_count, sync_feed_item, remove_feed_item, resync_feed_items
+from .search import SEARCH_FIELDS, autocomplete, search_backend
+from .search.unified import SEARCH_TYPES
+from .models import CONTENT_MODELS, AppUser, Author
+
+
+def _connect_feed_handlers(content_type, model):
+    def on_save(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        was_visible, is_visible = sync_feed_item(content_type, instance)
+        if was_visible != is_visible:
+            adjust_feed_count(content_type, 1 if is_visible else -1)
+
+    def on_delete(sender, instance, **kwargs):
+        if remove_feed_item(content_type, instance.pk):
+            adjust_feed_count(content_type, -1)
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f"feed_item_save_{content_type}")
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f"feed_item_delete_{content_type}")
+
+
+for _content_type, _model in CONTENT_MODELS.items():
+    _connect_feed_handlers(_content_type, _model)
+
+
+@receiver(post_save, sender=Author, dispatch_uid="feed_item_author_save")
+@receiver(post_delete, sender=Author, dispatch_uid="feed_item_author_delete")
+def refresh_author_feed_items(sender, instance, raw=False, **kwargs):
+    """Author name/photo (or the author itself) changed: refresh their feed cards"""
+    if raw:
+        return
+    resync_feed_items(author_id=instance.pk)
+
+
+@receiver(post_save, sender=AppUser, dispatch_uid="feed_item_user_save")
+def refresh_user_feed_items(sender, instance, created=False, raw=False, **kwargs):
+    """Username/profile photo changed: refresh feed cards of the user's poems and stories"""
+    if raw or created:
+        return
+    resync_feed_items(user_id=instance.pk)
+
+
+# ============================================
+# RESPONSE CACHE INVALIDATION
+# ============================================
+
+def _connect_cache_handlers(model, namespaces):
+    def on_change(sender, instance, raw=False, created=False, **kwargs):
+        if raw:
+            return
+        if sender is AppUser and created:
+            return  # A new user has no content yet
+        # After the commit: a request reading in between would cache the old rows under the new generation
+        transaction.on_commit(lambda: bump_generation(*namespaces))
+
+    post_save.connect(on_change, sender=model, weak=False, dispatch_uid=f"cache_save_{model.__name__}")
+    post_delete.connect(on_change, sender=model, weak=False, dispatch_uid=f"cache_delete_{model.__name__}")
+
+
+for _model, _namespaces in CACHE_NAMESPACES.items():
+    _connect_cache_handlers(_model, _namespaces)
+
+
+# ============================================
+# IN-PROCESS SEARCH AND AUTOCOMPLETE INDEXES
+# ============================================
+
+def _connect_search_handlers(model, fields):
+    def on_save(sender, instance, raw=False, **kwargs):
+        if raw or search_backend() != 'inverted':
+            return
+        from .search.inverted import update_document
+        update_document(model, instance.pk, [getattr(instance, field) for field in fields])
+
+    def on_delete(sender, instance, **kwargs):
+        if search_backend() != 'inverted':
+            return
+        from .search.inverted import update_document
+        update_document(model, instance.pk)
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f"search_save_{model.__name__}")
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f"search_delete_{model.__name__}")
+
+
+for _model, _fields in SEARCH_FIELDS.items():
+    _connect_search_handlers(_model, _fields)
+
+
+def _connect_autocomplete_handlers(search_type, model):
+    def on_save(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        autocomplete.update_title(search_type, instance)
+
+    def on_delete(sender, instance, **kwargs):
+        autocomplete.remove_title(search_type, instance.pk)
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f"autocomplete_save_{search_type}")
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f"autocomplete_delete_{search_type}")
+
+
+for _search_type, (_model, *_) in SEARCH_TYPES.items():
+    _connect_autocomplete_handlers(_search_type, _model)
@@ -1,3 +1,979 @@
-from django.test import TestCase
+import datetime
+import gzip
+import io
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import (
+    AppUser, Author, Audiobook, Book, Bookmark, Category, Comment, FeedItem, Image, Like,
+    Poem, ShortStory, Video,
+)
+
+
+class ListEndpointQueryCountTests(TestCase):
+    """List endpoints must run a fixed number of queries however many rows they return"""
+    ROWS = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = AppUser.objects.create(email="reader@example.com", username="reader", password="x")
+        category = Category.objects.create(name="Classics")
+        for i in range(cls.ROWS):
+            author = Author.objects.create(name=f"Author {i}", photo_url=f"https://example.com/{i}.jpg")
+            writer = AppUser.objects.create(email=f"writer{i}@example.com", username=f"writer{i}", password="x")
+            book = Book.objects.create(title=f"Book {i}", author=author, category=category)
+            Poem.objects.create(title=f"Poem {i}", content="...", author=author)
+            Poem.objects.create(title=f"User poem {i}", content="...", user=writer)
+            ShortStory.objects.create(title=f"Story {i}", content="...", author=author)
+            ShortStory.objects.create(title=f"User story {i}", content="...", user=writer)
+            Audiobook.objects.create(title=f"Audiobook {i}", author=author, audio_url="https://example.com/a.mp3")
+            Video.objects.create(title=f"Video {i}", author=author, video_url="https://example.com/v.mp4")
+            Image.objects.create(title=f"Image {i}", author=author, image_url="https://example.com/i.jpg")
+            Like.objects.create(user=writer, content_type="book", content_id=book.id)
+            Comment.objects.create(user=writer, content_type="book", content_id=book.id, text="Nice")
+            Bookmark.objects.create(user=cls.user, content_type="book", content_id=book.id)
+        cls.book = book
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def assertListQueries(self, num, url):
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_content_lists_use_a_single_query(self):
+        for url in ("/api/books/", "/api/poems/", "/api/short-stories/",
+                    "/api/audiobooks/", "/api/videos/", "/api/images/"):
+            with self.subTest(url=url):
+                self.assertListQueries(1, url)
+
+    def test_user_poems(self):
+        writer = AppUser.objects.get(username="writer0")
+        self.assertListQueries(1, f"/api/user-poems/?user_id={writer.id}")
+
+    def test_likes_and_comments(self):
+        query = f"content_type=book&content_id={self.book.id}"
+        self.assertListQueries(1, f"/api/likes/?{query}")
+        self.assertListQueries(1, f"/api/comments/?{query}")
+
+    def test_feed(self):
+        # Page + (materialized rows only) grouped like and comment counts + the user's liked and saved sets
+        for engine, base in (("sql", 1), ("materialized", 3)):
+            for user_query, user_queries in (("", 0), (f"&user_id={self.user.id}", 2)):
+                for limit in (2, 20):
+                    with self.subTest(engine=engine, user=bool(user_query), limit=limit), \
+                            override_settings(FEED_ENGINE=engine):
+                        cache.clear()
+                        response = self.assertListQueries(base + user_queries, f"/api/feed/?limit={limit}&count=false{user_query}")
+                        self.assertEqual(len(response.json()["items"]), limit)
+
+    def test_bookmarks(self):
+        # User lookup + rows
+        response = self.assertListQueries(2, f"/api/bookmarks/?user_id={self.user.id}")
+        self.assertEqual(response.json()["count"], self.ROWS)
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [Author.objects.create(name=f"Author {i}") for i in range(5)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def follow(self, url):
+        names = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            names.extend(author["name"] for author in response.json())
+            link = response.headers.get("Link")
+            url = link[1:link.index(">")] if link else None
+        return names
+
+    def test_page_number_mode(self):
+        response = self.client.get("/api/authors/?page_size=2&page=2")
+        self.assertEqual([a["name"] for a in response.json()], ["Author 2", "Author 3"])
+        self.assertEqual(response.headers["X-Total-Count"], "5")
+        self.assertIn("page=3", response.headers["Link"])
+        self.assertEqual(self.follow("/api/authors/?page_size=2"), [a.name for a in self.authors])
+
+    def test_cursor_mode(self):
+        self.assertEqual(self.follow("/api/authors/?cursor=&page_size=2"), [a.name for a in self.authors])
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_max_page_size(self):
+        response = self.client.get("/api/authors/?page_size=1000")
+        self.assertEqual(len(response.json()), 3)
+
+    def test_engagement_lists_keep_an_exact_count_with_cursors(self):
+        user = AppUser.objects.create(email="reader@example.com", username="reader", password="x")
+        for i in range(3):
+            Comment.objects.create(user=user, content_type="poem", content_id=1, text=f"Comment {i}")
+        first = self.client.get("/api/comments/?content_type=poem&content_id=1&cursor=&page_size=2").json()
+        self.assertEqual((first["count"], len(first["comments"])), (3, 2))
+        second = self.client.get(first["next"]).json()
+        self.assertEqual((second["count"], len(second["comments"]), second["next"]), (3, 1, None))
+        with self.assertNumQueries(1):  # Everything fits in the first page: no COUNT
+            only = self.client.get("/api/comments/?content_type=poem&content_id=1&cursor=").json()
+        self.assertEqual(only["count"], 3)
+
+    def test_headers_survive_the_response_cache(self):
+        first = self.client.get("/api/authors/?page_size=2")
+        second = self.client.get("/api/authors/?page_size=2")
+        self.assertEqual(first.headers["Link"], second.headers["Link"])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get("/api/authors/?page=0").status_code, 400)
+        self.assertEqual(self.client.get("/api/authors/?cursor=garbage").status_code, 400)
+
+
+class FeedPagingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from .feed import rebuild_feed_items
+
+        author = Author.objects.create(name="Premchand", photo_url="https://example.com/a.jpg")
+        user = AppUser.objects.create(email="kavi@example.com", username="kavi", password="x")
+        rows = [
+            Book.objects.create(title="Godan", author=author, description="Novel"),
+            Poem.objects.create(title="Users poem", content="...", user=user),
+            ShortStory.objects.create(title="Story", content="x" * 3000, author=author),
+            Audiobook.objects.create(title="Audiobook", author=author, audio_url="https://example.com/a.mp3"),
+            Video.objects.create(title="Video", author=author, video_url="https://example.com/v.mp4"),
+            Image.objects.create(title="Image", author=author, image_url="https://example.com/i.jpg"),
+            Poem.objects.create(title="Anonymous poem", content="..."),
+            Book.objects.create(title="Gaban", author=author),
+            Image.objects.create(title="Second image", author=author, image_url="https://example.com/j.jpg"),
+            Book.objects.create(title="Hidden", author=author, is_active=False),
+            ShortStory.objects.create(title="Pending", content="...", is_approved=False),
+        ]
+        # Every third row shares one timestamp, so pages split ties between types and ids
+        tied = timezone.now() - datetime.timedelta(days=1)
+        for i, row in enumerate(rows):
+            created_at = tied if i % 3 == 0 else tied - datetime.timedelta(minutes=i)
+            type(row).objects.filter(pk=row.pk).update(created_at=created_at)
+        rebuild_feed_items()
+
+    def setUp(self):
+        cache.clear()
+
+    def keys(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [(item["type"], item["id"]) for item in response.json()["items"]]
+
+    def walk(self, query):
+        keys, token = [], ""
+        while token is not None:
+            response = self.client.get(f"/api/feed/?{query}&cursor={token}")
+            keys.extend(self.keys(response))
+            token = response.json()["next"]
+        return keys
+
+    def test_cursor_walk_matches_offset_pages(self):
+        everything = self.keys(self.client.get("/api/feed/?limit=100"))
+        self.assertEqual(len(everything), 9)  # Inactive and unapproved rows are left out
+        by_offset = []
+        for offset in range(0, 9, 2):
+            by_offset.extend(self.keys(self.client.get(f"/api/feed/?limit=2&offset={offset}")))
+        self.assertEqual(by_offset, everything)
+        self.assertEqual(self.walk("limit=2"), everything)
+        self.assertEqual(self.walk("limit=4&types=book,poem"), [key for key in everything if key[0] in ("book", "poem")])
+
+    def test_cursor_pages_do_not_shift_on_inserts(self):
+        everything = self.keys(self.client.get("/api/feed/?limit=100"))
+        first = self.client.get("/api/feed/?limit=3&cursor=")
+        Poem.objects.create(title="Newest", content="...")
+        second = self.client.get(f"/api/feed/?limit=3&cursor={first.json()['next']}")
+        self.assertEqual(self.keys(second), everything[3:6])
+        # The offset page re-serves the last row of the first page
+        self.assertEqual(self.keys(self.client.get("/api/feed/?limit=3&offset=3"))[0], everything[2])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get("/api/feed/?cursor=garbage").status_code, 400)
+
+    def test_limit_and_offset_are_validated(self):
+        for query in ("limit=-1", "limit=0", "limit=abc", "offset=-1", "offset=x", "since=2000-01-01&limit=0"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"/api/feed/?{query}").status_code, 400)
+        with override_settings(API_MAX_PAGE_SIZE=4):
+            data = self.client.get("/api/feed/?limit=1000").json()
+        self.assertEqual(len(data["items"]), 4)
+        self.assertTrue(data["has_more"])
+
+    def test_engines_match_sql_row_for_row(self):
+        from .feed import FEED_COLUMNS, FEED_TYPES, decode_cursor, encode_cursor, fetch_feed_page
+
+        def page(engine, limit, offset=0, cursor=None, types=FEED_TYPES):
+            rows = fetch_feed_page(limit, offset, cursor, engine=engine, types=types)
+            for row in rows:  # Raw SQL on SQLite returns naive UTC timestamps
+                row["created_at"] = row["created_at"].replace(tzinfo=None)
+            return [[row[column] for column in FEED_COLUMNS] for row in rows]
+
+        everything = fetch_feed_page(100, engine="materialized")
+        cursors = [None] + [decode_cursor(encode_cursor(row)) for row in everything[2:6]]
+        for engine in ("merge", "materialized"):
+            for limit, offset in [(100, 0), (3, 0), (3, 2), (2, 7), (4, 20)]:
+                for types in (FEED_TYPES, ("book", "image"), ("story",)):
+                    with self.subTest(engine=engine, limit=limit, offset=offset, types=types):
+                        self.assertEqual(page(engine, limit, offset, types=types), page("sql", limit, offset, types=types))
+            for cursor in cursors:
+                with self.subTest(engine=engine, cursor=cursor):
+                    self.assertEqual(page(engine, 3, cursor=cursor), page("sql", 3, cursor=cursor))
+
+
+class FeedItemTests(TestCase):
+    def item(self, content_type, content_id):
+        return FeedItem.objects.get(content_type=content_type, content_id=content_id)
+
+    def test_saves_keep_the_item_in_sync(self):
+        author = Author.objects.create(name="Premchand")
+        poem = Poem.objects.create(title="Old", content="...", author=author)
+        item = self.item("poem", poem.id)
+        self.assertEqual((item.title, item.author_name, item.is_visible), ("Old", "Premchand", True))
+
+        poem.save()  # Nothing changed: updated_at (the sync position) stays put
+        self.assertEqual(self.item("poem", poem.id).updated_at, item.updated_at)
+        poem.title = "New"
+        poem.save()
+        self.assertEqual(self.item("poem", poem.id).title, "New")
+        self.assertGreater(self.item("poem", poem.id).updated_at, item.updated_at)
+        author.name = "Munshi Premchand"
+        author.save()
+        self.assertEqual(self.item("poem", poem.id).author_name, "Munshi Premchand")
+
+    def test_hidden_and_deleted_rows_leave_tombstones(self):
+        from .feed import rebuild_feed_items
+
+        poem = Poem.objects.create(title="Poem", content="...")
+        book = Book.objects.create(title="Book")
+        story = ShortStory.objects.create(title="Story", content="...")
+        poem.is_approved = False
+        poem.save()
+        book.is_active = False
+        book.save()
+        story_id = story.id
+        story.delete()
+        self.assertEqual(
+            set(FeedItem.objects.values_list("content_type", "is_visible")),
+            {("poem", False), ("book", False), ("story", False)},
+        )
+
+        book.is_active = True
+        book.save()
+        self.assertTrue(self.item("book", book.id).is_visible)
+        self.assertEqual(rebuild_feed_items(), 2)
+        self.assertFalse(self.item("story", story_id).is_visible)  # Kept for ?since= clients
+        with override_settings(FEED_ENGINE="materialized"):
+            items = self.client.get("/api/feed/").json()["items"]
+        self.assertEqual([(item["type"], item["id"]) for item in items], [("book", book.id)])
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = AppUser.objects.create(email="reader@example.com", username="reader", password="x")
+        cls.video = Video.objects.create(title="Video", video_url="https://example.com/v.mp4")
+
+    def counts(self):
+        self.video.refresh_from_db()
+        return self.video.like_count, self.video.comment_count
+
+    def test_likes_and_comments_move_the_counters(self):
+        target = {"user_id": self.user.id, "content_type": "video", "content_id": self.video.id}
+        self.client.post("/api/likes/toggle/", target)
+        comment = self.client.post("/api/comments/", {**target, "text": "Nice"}).json()["comment"]
+        self.client.post("/api/comments/", {**target, "text": "Again"})
+        self.assertEqual(self.counts(), (1, 2))
+
+        self.client.post("/api/likes/toggle/", target)
+        self.client.delete(f"/api/comments/{comment['id']}/", {"user_id": self.user.id}, content_type="application/json")
+        self.assertEqual(self.counts(), (0, 1))
+        self.client.post("/api/likes/toggle/", target)
+        self.assertEqual(self.counts(), (1, 1))
+
+    def test_counters_never_go_negative(self):
+        from .engagement import adjust_counter
+        adjust_counter("video", self.video.id, "like_count", -1)
+        adjust_counter("unknown", self.video.id, "like_count", 1)  # Ignored
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_reconcile_fixes_drifted_counters(self):
+        from .engagement import reconcile_counters
+        Like.objects.create(user=self.user, content_type="video", content_id=self.video.id)  # Bypasses the counter
+        Video.objects.filter(pk=self.video.pk).update(comment_count=7)
+        fixed = reconcile_counters(["video", "poem"])
+        self.assertEqual(fixed[("video", "like_count")], 1)
+        self.assertEqual(fixed[("video", "comment_count")], 1)
+        self.assertEqual(fixed[("poem", "like_count")], 0)
+        self.assertEqual(self.counts(), (1, 0))
+        self.assertEqual(set(reconcile_counters(["video"]).values()), {0})
+
+
+class RatingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.readers = [
+            AppUser.objects.create(email=f"reader{i}@example.com", username=f"reader{i}", password="x")
+            for i in range(2)
+        ]
+        cls.book = Book.objects.create(title="Godan")
+
+    def setUp(self):
+        cache.clear()
+
+    def review(self, reader, rating):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f"/api/books/{self.book.id}/reviews/", {"user_id": reader.id, "rating": rating})
+
+    def unreview(self, reader):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.delete(
+                f"/api/books/{self.book.id}/reviews/user/", {"user_id": reader.id}, content_type="application/json"
+            )
+
+    def stored(self):
+        self.book.refresh_from_db()
+        return self.book.rating_sum, self.book.rating_count, self.book.average_rating
+
+    def test_reviews_move_the_stored_rating(self):
+        self.assertEqual(self.review(self.readers[0], 4).status_code, 201)
+        self.review(self.readers[1], 2)
+        self.assertEqual(self.stored(), (6, 2, 3.0))
+        self.assertEqual(self.review(self.readers[0], 5).status_code, 200)  # Edit: old 4 out, new 5 in
+        self.assertEqual(self.stored(), (7, 2, 3.5))
+        self.assertEqual(self.unreview(self.readers[1]).status_code, 200)
+        self.assertEqual(self.stored(), (5, 1, 5.0))
+        self.assertEqual(self.unreview(self.readers[1]).status_code, 404)
+        self.assertEqual(self.review(self.readers[1], 9).status_code, 400)
+        self.assertEqual(self.stored(), (5, 1, 5.0))
+
+    def distribution(self):
+        response = self.client.get(f"/api/ratings/distribution/?type=book&ids={self.book.id}")
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()[str(self.book.id)]
+        return summary["review_count"], [summary["rating_distribution"][str(star)] for star in range(1, 6)]
+
+    def test_edits_and_deletes_move_the_star_buckets(self):
+        self.assertEqual(self.distribution(), (0, [0, 0, 0, 0, 0]))
+        self.review(self.readers[0], 4)
+        self.review(self.readers[1], 4)
+        self.assertEqual(self.distribution(), (2, [0, 0, 0, 2, 0]))
+        self.review(self.readers[0], 1)
+        self.assertEqual(self.distribution(), (2, [1, 0, 0, 1, 0]))
+        self.review(self.readers[0], 1)  # Same rating again: nothing moves
+        self.assertEqual(self.distribution(), (2, [1, 0, 0, 1, 0]))
+        self.unreview(self.readers[1])
+        self.assertEqual(self.distribution(), (1, [1, 0, 0, 0, 0]))
+        self.assertEqual(self.client.get("/api/ratings/distribution/?type=video&ids=1").status_code, 400)
+
+    def test_reconcile_after_a_cascading_delete(self):
+        from .engagement import reconcile_ratings
+        self.review(self.readers[0], 4)
+        self.review(self.readers[1], 1)
+        self.readers[1].delete()  # Takes the review with it, bypassing the views
+        self.assertEqual(self.stored(), (5, 2, 2.5))
+        self.assertEqual(reconcile_ratings(), {("book", "rating"): 1, ("poem", "rating"): 0})
+        self.assertEqual(self.stored(), (4, 1, 4.0))
+        self.assertEqual(self.distribution(), (1, [0, 0, 0, 1, 0]))
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = AppUser.objects.create(email="reader@example.com", username="reader", password="x")
+        cls.poem = Poem.objects.create(title="Poem", content="...")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counter_updates_invalidate_cached_lists(self):
+        self.assertEqual(self.client.get("/api/poems/").json()[0]["like_count"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/likes/toggle/", {"user_id": self.user.id, "content_type": "poem", "content_id": self.poem.id})
+        self.assertEqual(self.client.get("/api/poems/").json()[0]["like_count"], 1)
+
+    def test_saves_bump_the_generation_on_commit(self):
+        from .cache import get_generations
+        before = get_generations(["poems"])
+        with self.captureOnCommitCallbacks(execute=True):
+            Poem.objects.create(title="New", content="...")
+            self.assertEqual(get_generations(["poems"]), before)  # Readers may still cache the old rows now
+        self.assertNotEqual(get_generations(["poems"]), before)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_is_bypassed(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.client.get("/api/poems/")
+
+
+class PersonalizationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = AppUser.objects.create(email="reader@example.com", username="reader", password="x")
+        cls.poem = Poem.objects.create(title="Poem", content="...")
+
+    def setUp(self):
+        cache.clear()
+
+    def flags(self):
+        items = self.client.get(f"/api/feed/?user_id={self.user.id}").json()["items"]
+        liked = self.client.get(f"/api/likes/?content_type=poem&content_id={self.poem.id}&user_id={self.user.id}")
+        return items[0]["user_liked"], items[0]["user_saved"], liked.json()["user_liked"]
+
+    def test_toggles_patch_the_cached_sets(self):
+        self.assertEqual(self.flags(), (False, False, False))
+        self.client.post("/api/likes/toggle/", {"user_id": self.user.id, "content_type": "poem", "content_id": self.poem.id})
+        self.client.post("/api/bookmarks/toggle/", {"user_id": self.user.id, "content_type": "poem", "content_id": self.poem.id})
+        self.assertEqual(self.flags(), (True, True, True))
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_reads_the_database(self):
+        self.assertEqual(self.flags(), (False, False, False))
+        # Written by another worker: nothing in this process was told
+        Like.objects.create(user=self.user, content_type="poem", content_id=self.poem.id)
+        self.assertEqual(self.flags(), (True, False, True))
+
+
+class FeedCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.poem = Poem.objects.create(title="Poem", content="...")
+
+    def setUp(self):
+        cache.clear()
+
+    def total(self):
+        return self.client.get("/api/feed/?types=poem").json()["total"]
+
+    def test_writes_adjust_the_cached_count_on_commit(self):
+        self.assertEqual(self.total(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Poem.objects.create(title="New", content="...")
+        self.assertEqual(self.total(), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.poem.delete()
+        self.assertEqual(self.total(), 1)
+
+        try:
+            with transaction.atomic():
+                Poem.objects.create(title="Rolled back", content="...")
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(self.total(), 1)
+
+    def test_count_racing_a_write_is_not_cached(self):
+        from . import feed
+        count_visible = feed._count_visible
+
+        def count_then_write(content_type):
+            count = count_visible(content_type)
+            with self.captureOnCommitCallbacks(execute=True):
+                Poem.objects.create(title="Late", content="...")
+            return count
+
+        with mock.patch.object(feed, "_count_visible", count_then_write):
+            self.assertEqual(feed.count_feed_items(("poem",)), 1)
+        self.assertEqual(self.total(), 2)
+
+
+class FeedSyncTests(TestCase):
+    def sync(self, since):
+        response = self.client.get("/api/feed/", {"since": since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_rows_committed_after_the_token_are_still_delivered(self):
+        first = Poem.objects.create(title="First", content="...")
+        token = self.sync("2000-01-01T00:00:00+00:00")["next"]
+        # Stamped before the token's change but committed (visible) only now
+        late = Poem.objects.create(title="Late", content="...")
+        FeedItem.objects.filter(content_type="poem", content_id=late.id).update(
+            updated_at=FeedItem.objects.get(content_type="poem", content_id=first.id).updated_at - datetime.timedelta(seconds=1)
+        )
+        data = self.sync(token)
+        self.assertIn(("poem", late.id), [(item["type"], item["id"]) for item in data["items"]])
+        self.assertEqual(data["next"], token)  # Nothing after the token yet
+
+    @override_settings(FEED_SYNC_OVERLAP=0)
+    def test_hidden_and_deleted_rows_come_back_as_tombstones(self):
+        kept = Poem.objects.create(title="Kept", content="...")
+        hidden = Poem.objects.create(title="Hidden", content="...")
+        gone = Book.objects.create(title="Gone")
+        first = self.sync("2000-01-01T00:00:00+00:00")
+        self.assertEqual(len(first["items"]), 3)
+        self.assertEqual(first["deleted"], [])
+
+        hidden.is_active = False
+        hidden.save()
+        gone_id = gone.id
+        gone.delete()
+        data = self.sync(first["next"])
+        self.assertEqual(data["items"], [])
+        self.assertCountEqual(data["deleted"], [{"type": "poem", "id": hidden.id}, {"type": "book", "id": gone_id}])
+
+        kept.title = "Kept, edited"
+        kept.save()
+        response = self.client.get("/api/feed/", {"since": data["next"], "limit": 1})
+        self.assertEqual([item["title"] for item in response.json()["items"]], ["Kept, edited"])
+        self.assertEqual(response.json()["deleted"], [])
+        self.assertFalse(response.json()["has_more"])
+
+
+class SparseFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name="Author")
+        Poem.objects.create(title="Poem", content="Long poem text", author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_card_projection_never_reads_content(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/poems/")
+        self.assertNotIn("content", response.json()[0])
+        self.assertEqual(response.json()[0]["author_name"], "Author")
+        self.assertNotIn('"content"', queries.captured_queries[0]["sql"])
+
+    def test_fields_and_exclude(self):
+        response = self.client.get("/api/poems/?fields=id,title,content&exclude=id")
+        self.assertEqual(response.json(), [{"title": "Poem", "content": "Long poem text"}])
+        self.assertIn("content", self.client.get("/api/poems/?fields=all").json()[0])
+        self.assertEqual(self.client.get("/api/poems/?fields=nope").status_code, 400)
+
+
+class FastPathConformanceTests(TestCase):
+    """accounts.fastpath must render exactly what BookSerializer/PoemSerializer render"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name="Author", photo_url="https://example.com/a.jpg")
+        bare_author = Author.objects.create(name="No photo")
+        writer = AppUser.objects.create(email="w@example.com", username="writer", password="x",
+                                        profile_photo="https://example.com/w.jpg")
+        category = Category.objects.create(name="Classics")
+        Book.objects.create(title="Full", author=author, category=category, genre="drama",
+                            is_paid=True, price="12.5", published_year=1999)
+        Book.objects.create(title="Bare")
+        Poem.objects.create(title="By author", content="...", author=author, category="love", genre="ghazal")
+        Poem.objects.create(title="By user", content="...", user=writer, genre="unknown-genre")
+        Poem.objects.create(title="By both", content="...", author=bare_author, user=writer)
+        Poem.objects.create(title="Orphan", content="...")
+        book = Book.objects.get(title="Full")
+        book.rating_sum, book.rating_count, book.average_rating, book.rating_4 = 4, 1, 4.0, 1
+        book.save()
+
+    def assertConforms(self, model, serializer_class, fields=None):
+        from .fastpath import render_rows, values_queryset
+        from .serializers import project
+
+        queryset = model.objects.for_api().order_by('pk')
+        expected = serializer_class(project(queryset, serializer_class, fields), many=True, fields=fields).data
+        actual = render_rows(values_queryset(queryset, serializer_class, fields), serializer_class, fields)
+        self.assertEqual(json.dumps(actual), json.dumps(expected))
+
+    def test_books(self):
+        from .serializers import BookSerializer
+        self.assertConforms(Book, BookSerializer)
+        self.assertConforms(Book, BookSerializer, ["title", "author_name", "price", "created_at"])
+
+    def test_poems(self):
+        from .serializers import PoemSerializer
+        self.assertConforms(Poem, PoemSerializer)
+        self.assertConforms(Poem, PoemSerializer, list(PoemSerializer.CARD_FIELDS))
+
+    @override_settings(API_FAST_LISTS=False)
+    def test_endpoint_matches_serializer_path(self):
+        slow = APIClient().get("/api/poems/?fields=all").content
+        cache.clear()
+        with override_settings(API_FAST_LISTS=True):
+            fast = APIClient().get("/api/poems/?fields=all").content
+        self.assertEqual(fast, slow)
+
+    def test_field_order_shares_one_plan(self):
+        from .fastpath import _plan
+        _plan.cache_clear()
+        for query in ("fields=title,price", "fields=price,title", "fields=title,price&page=2"):
+            self.client.get(f"/api/books/?{query}")
+        self.assertEqual(_plan.cache_info().currsize, 2)  # Column plan (no timezone) + render plan
+        self.assertEqual(_plan.cache_info().maxsize, 256)
+
+
+class ORJSONRendererTests(TestCase):
+    def test_matches_drf_json_renderer(self):
+        from decimal import Decimal
+        from django.utils.translation import gettext_lazy
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import ORJSONParser, ORJSONRenderer
+
+        data = {
+            "created_at": timezone.now(),
+            "naive": datetime.datetime(2024, 1, 2, 3, 4, 5),
+            "day": datetime.date(2024, 1, 2),
+            "price": Decimal("12.50"),
+            "label": gettext_lazy("Poetry"),
+            "text": "कविता\u2028line\u2029",
+            "counts": {1: 2},
+            "items": [1.5, None, True],
+        }
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(rendered))["text"], data["text"])
+
+
+class CompressionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name="लेखक")
+        for i in range(20):
+            Poem.objects.create(title=f"कविता {i}", description="मन की बात " * 20, content="...", author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_gzip_above_threshold(self):
+        response = self.client.get("/api/poems/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        body = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(body), 20)
+
+    def test_small_and_unaccepted_bodies_are_left_alone(self):
+        self.assertFalse(self.client.get("/api/health/", HTTP_ACCEPT_ENCODING="gzip").has_header("Content-Encoding"))
+        self.assertFalse(self.client.get("/api/poems/", HTTP_ACCEPT_ENCODING="gzip;q=0").has_header("Content-Encoding"))
+
+    def test_negotiation(self):
+        from . import middleware
+        self.assertEqual(middleware.choose_encoding("gzip;q=0.5, br"), "br" if middleware.brotli else "gzip")
+        self.assertEqual(middleware.choose_encoding("*"), "br" if middleware.brotli else "gzip")
+        self.assertIsNone(middleware.choose_encoding("identity"))
+
+    def test_streaming_and_etag(self):
+        from django.http import StreamingHttpResponse
+        from django.test import RequestFactory
+        from .middleware import CompressionMiddleware
+
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        response = StreamingHttpResponse(iter([b"a" * 2000, b"b" * 2000]))
+        response["ETag"] = '"abc"'
+        response = CompressionMiddleware(lambda r: response)(request)
+        self.assertEqual(response["ETag"], 'W/"abc"')
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), b"a" * 2000 + b"b" * 2000)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name="Author")
+        Poem.objects.create(title="ज़िंदगी", content="...", author=author)
+        Poem.objects.create(title="Other", content="चाँद की रात", author=author)
+        ShortStory.objects.create(title="Story", content="गाँव की कहानी", author=author)
+        Book.objects.create(title="Book", description="सफ़र", author=author)
+
+    def setUp(self):
+        from .search import inverted
+        cache.clear()
+        inverted.rebuild_index()  # The index outlives each test's transaction: start from this class's rows
+
+    def test_normalize_text_folds_devanagari_variants(self):
+        from .search import normalize_text
+        self.assertEqual(normalize_text("\u095b\u093f\u0902\u0926\u0917\u0940"), "जिंदगी")  # precomposed za
+        self.assertEqual(normalize_text("\u091c\u093c\u093f\u0902\u0926\u0917\u0940"), "जिंदगी")  # ja + nukta
+        self.assertEqual(normalize_text(" चाँद\u200d  रात "), "चांद रात")
+
+    def test_list_endpoints_search(self):
+        self.assertEqual([p["title"] for p in self.client.get("/api/poems/?search=चाँद").json()], ["Other"])
+        self.assertEqual(len(self.client.get("/api/short-stories/?search=कहानी").json()), 1)
+        self.assertEqual(len(self.client.get("/api/books/?search=सफ़र").json()), 1)
+        self.assertEqual(self.client.get("/api/poems/?search=nothing").json(), [])
+
+
+class UnifiedSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name="प्रेमचंद")
+        Book.objects.create(title="गोदान", author=author)
+        Poem.objects.create(title="गोदान पर कविता", content="...", author=author)
+        ShortStory.objects.create(title="ईदगाह", content="...", author=author)
+        Video.objects.create(title="गोदान", author=author, video_url="https://example.com/v.mp4", is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_merges_types_best_first(self):
+        hits = self.client.get("/api/search/?q=गोदान").json()
+        self.assertEqual([(hit["type"], hit["title"]) for hit in hits], [("book", "गोदान"), ("poem", "गोदान पर कविता")])
+        self.assertEqual(hits[0]["author_name"], "प्रेमचंद")
+        author = self.client.get("/api/search/?q=प्रेमचंद&types=author").json()
+        self.assertEqual([hit["type"] for hit in author], ["author"])
+
+    def test_pagination_and_errors(self):
+        response = self.client.get("/api/search/?q=गोदान&page_size=1")
+        self.assertEqual(len(response.json()), 1)
+        self.assertIn("page=2", response.headers["Link"])
+        self.assertEqual(self.client.get("/api/search/").status_code, 400)
+        self.assertEqual(self.client.get("/api/search/?q=x&types=song").status_code, 400)
+
+
+class InvertedIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def make_index(self):
+        from .search.inverted import InvertedIndex
+        index = InvertedIndex()
+        index.add(0, 1, ["ज़िंदगी की किताब", None, "सफ़र में चाँद निकला।"])
+        index.add(0, 2, ["Night ghazal", "love ghazal", "moonlight"])
+        index.add(1, 3, ["कहानी", None, "गाँव की कहानी और ज़िंदगी"])
+        return index
+
+    def test_tokenizer_keeps_devanagari_words_whole(self):
+        from .search.inverted import tokenize
+        self.assertEqual(tokenize("सफ़र में चाँद निकला। क्षत्रिय"), ["सफर", "में", "चांद", "निकला", "क्षत्रिय"])
+
+    def test_bm25_ranking_and_typos(self):
+        index = self.make_index()
+        # Title words outrank body words; ?codes restricts the document type
+        self.assertEqual([pk for _, _, pk in index.search("जिंदगी")], [1, 3])
+        self.assertEqual([pk for _, _, pk in index.search("जिंदगी", codes={1})], [3])
+        # Unknown words stand for their closest indexed words
+        self.assertEqual([pk for _, _, pk in index.search("gazal")], [2])
+        self.assertEqual([pk for _, _, pk in index.search("कहनी")], [3])
+
+    def test_segment_round_trip_and_updates(self):
+        import os
+        import tempfile
+        from .search.inverted import InvertedIndex, _Segment
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "search.idx")
+            self.make_index().write(path)
+            index = InvertedIndex(_Segment(path))
+            self.assertEqual(index.search("gazal"), self.make_index().search("gazal"))
+            index.add(0, 2, ["Changed", None, "text"])
+            index.remove(1, 3)
+            self.assertEqual(index.search("ghazal"), [])
+            index.write(path)
+            index = InvertedIndex(_Segment(path))
+            self.assertEqual(index.live, 2)
+            self.assertEqual([pk for _, _, pk in index.search("changed")], [2])
+            self.assertEqual([pk for _, _, pk in index.search("कहानी")], [])
+
+    def test_signals_update_the_shared_file(self):
+        import os
+        import tempfile
+        from .search import inverted
+        from .search.shared import SharedIndex
+
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(SEARCH_INDEX_PATH=os.path.join(directory, "search.idx")):
+            path = os.path.join(directory, "search.idx")
+            inverted.rebuild_index()
+            segment = os.stat(path)
+            with self.captureOnCommitCallbacks(execute=True):
+                poem = Poem.objects.create(title="दीपावली", content="...")
+            # Saves only append to the journal; the segment is left alone
+            self.assertEqual(os.stat(path).st_mtime_ns, segment.st_mtime_ns)
+            # What another worker sees: the segment plus the journal
+            other = SharedIndex("SEARCH_INDEX_PATH", inverted._shared.load, inverted.build_index, inverted._apply)
+            self.assertEqual([pk for _, _, pk in other.get().search("दीपावली")], [poem.pk])
+            self.assertEqual([p["id"] for p in self.client.get("/api/poems/?search=दीपावली").json()], [poem.pk])
+            with self.captureOnCommitCallbacks(execute=True):
+                poem.delete()
+            self.assertEqual(other.get().search("दीपावली"), [])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                poem = Poem.objects.create(title="होली", content="...")
+            inverted._shared.compact()
+            self.assertEqual(os.path.getsize(path + ".journal"), 0)
+            fresh = inverted.InvertedIndex(inverted._Segment(path))
+            self.assertEqual([pk for _, _, pk in fresh.search("होली")], [poem.pk])
+            self.assertEqual(fresh.search("दीपावली"), [])
+            self.assertEqual([pk for _, _, pk in other.get().search("होली")], [poem.pk])
+        inverted.rebuild_index()
+
+
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(name="प्रेमचंद")
+        cls.book = Book.objects.create(title="गोदान", author=cls.author)
+        cls.poem = Poem.objects.create(title="गोदान पर कविता", content="...", author=cls.author)
+        Video.objects.create(title="गोदान", author=cls.author, video_url="https://example.com/v.mp4", is_active=False)
+
+    def setUp(self):
+        from .search import autocomplete
+        autocomplete.rebuild_index()  # The index outlives each test's transaction: start from this class's rows
+
+    def complete(self, query):
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/api/autocomplete/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return [(item["type"], item["text"]) for item in response.json()]
+
+    def test_prefix_and_inner_word_matches(self):
+        self.assertEqual(self.complete("q=गो"), [("book", "गोदान"), ("poem", "गोदान पर कविता")])
+        self.assertEqual(self.complete("q=कवि"), [("poem", "गोदान पर कविता")])
+        self.assertEqual(self.complete("q=प्रेम&types=author"), [("author", "प्रेमचंद")])
+        self.assertEqual(self.complete("q=गो&limit=1"), [("book", "गोदान")])
+        self.assertEqual(self.complete("q="), [])
+
+    def test_saves_update_the_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.poem.title = "नई कविता"
+            self.poem.save()
+            self.book.is_active = False
+            self.book.save()
+        self.assertEqual(self.complete("q=गो"), [])
+        self.assertEqual(self.complete("q=नई"), [("poem", "नई कविता")])
+
+    def test_rolled_back_saves_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Author.objects.create(name="Phantom Writer")
+                    self.assertEqual(self.complete("q=phan"), [])  # Not before the commit either
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            Author.objects.create(name="Phanishwar Nath Renu")  # A later, unrelated commit
+        self.assertEqual(self.complete("q=phan"), [("author", "Phanishwar Nath Renu")])
+
+    def test_saves_do_not_build_an_unloaded_index(self):
+        import os
+        import tempfile
+        from .search import autocomplete
+        from .search.shared import SharedIndex
+
+        load, build = mock.Mock(), mock.Mock()
+        fresh = SharedIndex("AUTOCOMPLETE_INDEX_PATH", load, build, autocomplete._apply)  # A worker that served no search yet
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "autocomplete.idx")
+            with override_settings(AUTOCOMPLETE_INDEX_PATH=path), mock.patch.object(autocomplete, "_shared", fresh), \
+                    self.captureOnCommitCallbacks(execute=True):
+                author = Author.objects.create(name="गोपालदास नीरज")
+            with open(path + ".journal") as journal:
+                self.assertEqual([json.loads(line) for line in journal], [[autocomplete.TYPES.index("author"), author.pk, "गोपालदास नीरज"]])
+        load.assert_not_called()
+        build.assert_not_called()
+
+    def test_shared_file(self):
+        import os
+        import tempfile
+        from .search import autocomplete
+        from .search.shared import SharedIndex
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "autocomplete.idx")
+            with override_settings(AUTOCOMPLETE_INDEX_PATH=path):
+                autocomplete.rebuild_index()
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.book.delete()
+                    Image.objects.create(title="गोधूलि", author=self.author, image_url="https://example.com/i.jpg")
+                # What another worker sees: the segment plus the journal
+                other = SharedIndex("AUTOCOMPLETE_INDEX_PATH", autocomplete._shared.load, autocomplete.build_index, autocomplete._apply)
+                self.assertEqual([text for _, _, text in other.get().complete("गो")], ["गोधूलि", "गोदान पर कविता"])
+                self.assertEqual(self.complete("q=गो"), [("image", "गोधूलि"), ("poem", "गोदान पर कविता")])
+        autocomplete.rebuild_index()
+
+
+class MetaBundleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bundle_etag_and_revalidation(self):
+        Category.objects.create(name="Classics")
+        Category.objects.create(name="Hidden", is_active=False)
+        response = self.client.get("/api/meta/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("max-age=", response["Cache-Control"])
+        data = response.json()
+        self.assertEqual(response["ETag"], f'"{data["version"]}"')
+        self.assertEqual([category["name"] for category in data["categories"]], ["Classics"])
+        self.assertEqual(data["choices"]["poem_categories"][0], {"value": "love", "label": Poem.CATEGORY_LABELS["love"]})
+        self.assertEqual(set(data["choices"]), {
+            "book_genres", "book_file_types", "poem_genres", "poem_categories", "story_genres",
+            "audiobook_genres", "video_categories", "image_categories", "content_types",
+        })
+
+        with self.assertNumQueries(0):
+            cached = self.client.get("/api/meta/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Drama")
+        changed = self.client.get("/api/meta/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], response["ETag"])
+        self.assertEqual([category["name"] for category in changed.json()["categories"]], ["Classics", "Drama"])
+
+    def test_bundle_expires_without_a_generation_bump(self):
+        import time
+
+        from django.conf import settings
+
+        category = Category.objects.create(name="Classics")
+        etag = self.client.get("/api/meta/")["ETag"]
+        Category.objects.filter(pk=category.pk).update(name="Epics")  # No signal, no bump
+        self.assertEqual(self.client.get("/api/meta/")["ETag"], etag)
+
+        with mock.patch("accounts.meta.time.monotonic", return_value=time.monotonic() + settings.META_BUNDLE_TTL + 1):
+            expired = self.client.get("/api/meta/")
+        self.assertNotEqual(expired["ETag"], etag)
+        self.assertEqual([category["name"] for category in expired.json()["categories"]], ["Epics"])
+
+
+class AuthorWorksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(name="Premchand")
+        other = Author.objects.create(name="Other")
+        for i in range(3):
+            Book.objects.create(title=f"Book {i}", author=cls.author)
+            Poem.objects.create(title=f"Poem {i}", content="...", author=cls.author)
+            ShortStory.objects.create(title=f"Story {i}", content="...", author=cls.author)
+            Audiobook.objects.create(title=f"Audiobook {i}", author=cls.author, audio_url="https://example.com/a.mp3")
+            Video.objects.create(title=f"Video {i}", author=cls.author, video_url="https://example.com/v.mp4")
+            Image.objects.create(title=f"Image {i}", author=cls.author, image_url="https://example.com/i.jpg")
+        Book.objects.create(title="Hidden", author=cls.author, is_active=False)
+        ShortStory.objects.create(title="Pending", content="...", author=cls.author, is_approved=False)
+        Book.objects.create(title="Someone else's", author=other)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_and_first_pages_in_fixed_queries(self):
+        with self.assertNumQueries(7):
+            response = self.client.get(f"/api/authors/{self.author.pk}/works/?page_size=2")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["author"]["name"], "Premchand")
+        self.assertEqual(data["counts"], {work_type: 3 for work_type in data["works"]})
+        self.assertEqual([item["title"] for item in data["works"]["book"]], ["Book 2", "Book 1"])
+        self.assertEqual([item["title"] for item in data["works"]["story"]], ["Story 2", "Story 1"])
+        self.assertNotIn("content", data["works"]["poem"][0])  # List card fields
+
+    def test_cached_until_content_changes(self):
+        url = f"/api/authors/{self.author.pk}/works/"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Video.objects.filter(author=self.author).first().delete()
+        self.assertEqual(self.client.get(url).json()["counts"]["video"], 2)
+        self.assertEqual(self.client.get("/api/authors/999999/works/").status_code, 404)
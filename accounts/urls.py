@@ -8,8 +8,10 @@ from .views import (
     AuthorListView,
     AuthorDetailView,
     AuthorDetailUpdateView,
+    AuthorWorksView,
     GenreChoicesView,
     PoemGenreChoicesView,
+    MetaView,
     BookListView,
     BookDetailView,
     UploadImageView,
@@ -27,7 +29,10 @@ from .views import (
     BookReviewDetailView,
     PoemReviewListView,
     PoemReviewDetailView,
+    RatingDistributionView,
     UnifiedFeedView,
+    SearchView,
+    AutocompleteView,
     ShortStoryListView,
     ShortStoryDetailView,
     AudiobookListView,
@@ -55,6 +60,10 @@ urlpatterns = [
     # Unified Feed
     path("feed/", UnifiedFeedView.as_view(), name="unified_feed"),
     
+    # Cross-content search
+    path("search/", SearchView.as_view(), name="search"),
+    path("autocomplete/", AutocompleteView.as_view(), name="autocomplete"),
+    
     path("app/register/", AppRegisterView.as_view()),
     path("app/login/", AppLoginView.as_view()),
     path("app/profile/<int:pk>/", AppProfileUpdateView.as_view()),
@@ -67,8 +76,10 @@ urlpatterns = [
     path("categories/", CategoryListView.as_view()),
     path("authors/", AuthorListView.as_view()),
     path("authors/<int:pk>/", AuthorDetailUpdateView.as_view()),
+    path("authors/<int:pk>/works/", AuthorWorksView.as_view(), name="author_works"),
     path("genres/", GenreChoicesView.as_view()),
     path("poem-genres/", PoemGenreChoicesView.as_view()),
+    path("meta/", MetaView.as_view(), name="meta"),
     path("books/", BookListView.as_view()),
     path("books/<int:pk>/", BookDetailView.as_view()),
     
@@ -93,6 +104,7 @@ urlpatterns = [
     path("books/<int:book_id>/reviews/user/", BookReviewDetailView.as_view()),
     path("poems/<int:poem_id>/reviews/", PoemReviewListView.as_view()),
     path("poems/<int:poem_id>/reviews/user/", PoemReviewDetailView.as_view()),
+    path("ratings/distribution/", RatingDistributionView.as_view()),
     
     # Short Story Endpoints (literary content)
     path("short-stories/", ShortStoryListView.as_view()),
@@ -6,8 +6,8 @@ from rest_framework.permissions import AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.core.mail import send_mail
 from django.conf import settings
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils import timezone
 import cloudinary.uploader
 from datetime import datetime
@@ -22,9 +22,34 @@ from .serializers import (
     LikeSerializer,
     CommentSerializer,
     BookmarkSerializer,
-    StorySerializer
+    StorySerializer,
+    project,
+    select_fields,
+)
+from django.db import transaction
+from .cache import cached_api_response
+from .meta import CHOICES, meta_bundle
+from .pagination import Page, limit_offset, next_page_url, page_bounds, page_size, paginate, paginated_response
+from .fastpath import render_rows, values_queryset
+from .search import search_queryset
+from .search.autocomplete import complete
+from .search.unified import parse_search_types, search_all
+from .engagement import RATING_SOURCES, adjust_counter, apply_rating_change
+from .models import CONTENT_MODELS, RATING_STAR_FIELDS, RATING_STARS
+from .personalization import find_user_likes, record_bookmark, record_like
+from .works import author_works
+from .feed import (
+    InvalidCursor,
+    count_feed_items,
+    decode_cursor,
+    encode_cursor,
+    encode_sync_token,
+    enrich_feed_items,
+    fetch_feed_changes,
+    fetch_feed_page,
+    parse_feed_types,
+    parse_since,
 )
-from django.db import models
 
 
 class HealthCheckView(APIView):
@@ -90,6 +115,7 @@ class AppLoginView(APIView):
 
 # Category Views
 class CategoryListView(APIView):
+    @cached_api_response("categories")
     def get(self, request):
         categories = Category.objects.filter(is_active=True)
         serializer = CategorySerializer(categories, many=True)
@@ -114,10 +140,15 @@ class CategoryListView(APIView):
 
 # Author Views
 class AuthorListView(APIView):
+    @cached_api_response("authors")
     def get(self, request):
         authors = Author.objects.all()
-        serializer = AuthorSerializer(authors, many=True)
-        return Response(serializer.data)
+        page, error = paginate(request, authors)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        serializer = AuthorSerializer(page.items, many=True)
+        return paginated_response(serializer.data, page)
     
     def post(self, request):
         user_id = request.data.get("user_id")
@@ -177,28 +208,51 @@ class AuthorDetailView(APIView):
 class GenreChoicesView(APIView):
     def get(self, request):
         """Return all available genre choices"""
-        genres = [{"value": choice[0], "label": choice[1]} for choice in Book.GENRE_CHOICES]
-        return Response(genres)
+        return Response(CHOICES['book_genres'])
 
 
 class PoemGenreChoicesView(APIView):
     def get(self, request):
         """Return all available poem genre choices"""
-        from .models import Poem
-        genres = [{"value": choice[0], "label": choice[1]} for choice in Poem.GENRE_CHOICES]
-        return Response(genres)
+        return Response(CHOICES['poem_genres'])
+
+
+class MetaView(APIView):
+    """All choice tables and active categories in one bundle, versioned by a content-hash ETag"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        body, etag = meta_bundle()
+        response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=settings.META_CACHE_MAX_AGE)
+        return get_conditional_response(request, etag=etag, response=response)
+
+
+def apply_rating_filters(queryset, params):
+    """Apply ?min_rating= and ?sort=top_rated using the stored average_rating column; returns (queryset, error)"""
+    min_rating = params.get('min_rating')
+    if min_rating:
+        try:
+            queryset = queryset.filter(average_rating__gte=float(min_rating))
+        except ValueError:
+            return queryset, "min_rating must be a number"
+    if params.get('sort') == 'top_rated':
+        queryset = queryset.order_by('-average_rating', '-rating_count', '-created_at')
+    return queryset, None
 
 
 # Book Views
 class BookListView(APIView):
+    @cached_api_response("books", "authors", "categories")
     def get(self, request):
         # Check if admin wants to see all books (including inactive)
         show_all = request.query_params.get('show_all', 'false').lower() == 'true'
         
         if show_all:
-            books = Book.objects.all().select_related('author', 'category')
+            books = Book.objects.for_api()
         else:
-            books = Book.objects.filter(is_active=True).select_related('author', 'category')
+            books = Book.objects.for_api().filter(is_active=True)
         
         # Filter by category
         category_id = request.query_params.get('category')
@@ -215,8 +269,33 @@ class BookListView(APIView):
         if genre:
             books = books.filter(genre=genre)
         
-        serializer = BookSerializer(books, many=True)
-        return Response(serializer.data)
+        # Full-text search, best matches first
+        search = request.query_params.get('search')
+        if search:
+            books = search_queryset(books, search)
+        
+        books, error = apply_rating_filters(books, request.query_params)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        fields, error = select_fields(request.query_params, BookSerializer)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        # Fast path: plain .values() rows rendered by precompiled mappers
+        fast = settings.API_FAST_LISTS
+        if fast:
+            books = values_queryset(books, BookSerializer, fields)
+        else:
+            books = project(books, BookSerializer, fields)
+        page, error = paginate(request, books)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        if fast:
+            return paginated_response(render_rows(page.items, BookSerializer, fields), page)
+        serializer = BookSerializer(page.items, many=True, fields=fields)
+        return paginated_response(serializer.data, page)
     
     def post(self, request):
         user_id = request.data.get("user_id")
@@ -235,9 +314,10 @@ class BookListView(APIView):
 
 
 class BookDetailView(APIView):
+    @cached_api_response("books", "authors", "categories")
     def get(self, request, pk):
         try:
-            book = Book.objects.select_related('author', 'category').get(pk=pk)
+            book = Book.objects.for_api().get(pk=pk)
             serializer = BookSerializer(book)
             return Response(serializer.data)
         except Book.DoesNotExist:
@@ -559,11 +639,12 @@ class ForgotPasswordResetView(APIView):
 class PoemListView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("poems", "authors", "users")
     def get(self, request):
         """Get all active poems with optional filtering"""
         from .serializers import PoemSerializer
         
-        poems = Poem.objects.filter(is_active=True)
+        poems = Poem.objects.for_api().filter(is_active=True)
         
         # Filter by category (string-based)
         category = request.query_params.get('category')
@@ -580,16 +661,33 @@ class PoemListView(APIView):
         if author_id:
             poems = poems.filter(author_id=author_id)
         
-        # Search by title or content
+        # Full-text search, best matches first
         search = request.query_params.get('search')
         if search:
-            poems = poems.filter(
-                models.Q(title__icontains=search) | 
-                models.Q(content__icontains=search)
-            )
+            poems = search_queryset(poems, search)
         
-        serializer = PoemSerializer(poems, many=True)
-        return Response(serializer.data)
+        poems, error = apply_rating_filters(poems, request.query_params)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        fields, error = select_fields(request.query_params, PoemSerializer)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        # Fast path: plain .values() rows rendered by precompiled mappers
+        fast = settings.API_FAST_LISTS
+        if fast:
+            poems = values_queryset(poems, PoemSerializer, fields)
+        else:
+            poems = project(poems, PoemSerializer, fields)
+        page, error = paginate(request, poems)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        if fast:
+            return paginated_response(render_rows(page.items, PoemSerializer, fields), page)
+        serializer = PoemSerializer(page.items, many=True, fields=fields)
+        return paginated_response(serializer.data, page)
     
     def post(self, request):
         """Create new poem (admin only)"""
@@ -615,11 +713,12 @@ class PoemListView(APIView):
 class PoemDetailView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("poems", "authors", "users")
     def get(self, request, pk):
         """Get single poem details"""
         try:
             from .serializers import PoemSerializer
-            poem = Poem.objects.get(pk=pk, is_active=True)
+            poem = Poem.objects.for_api().get(pk=pk, is_active=True)
             serializer = PoemSerializer(poem)
             return Response(serializer.data)
         except Poem.DoesNotExist:
@@ -683,7 +782,7 @@ class UserPoemView(APIView):
         
         try:
             from .serializers import PoemSerializer
-            poems = Poem.objects.filter(user_id=user_id, is_active=True)
+            poems = Poem.objects.for_api().filter(user_id=user_id, is_active=True)
             serializer = PoemSerializer(poems, many=True)
             return Response(serializer.data)
         except Exception as e:
@@ -783,17 +882,28 @@ class BookReviewListView(APIView):
             return Response({"error": "user_id and rating required"}, status=400)
         
         try:
-            user = AppUser.objects.get(id=user_id)
-            book = Book.objects.get(id=book_id)
-        except (AppUser.DoesNotExist, Book.DoesNotExist):
-            return Response({"error": "User or Book not found"}, status=404)
+            rating = int(rating)
+        except (TypeError, ValueError):
+            rating = 0
+        if not 1 <= rating <= 5:
+            return Response({"error": "rating must be between 1 and 5"}, status=400)
         
-        # Check if review already exists
-        review, created = BookReview.objects.update_or_create(
-            book=book,
-            user=user,
-            defaults={'rating': rating, 'comment': comment}
-        )
+        with transaction.atomic():
+            try:
+                user = AppUser.objects.get(id=user_id)
+                # Row lock serializes concurrent reviews while the rating columns change
+                book = Book.objects.select_for_update().get(id=book_id)
+            except (AppUser.DoesNotExist, Book.DoesNotExist):
+                return Response({"error": "User or Book not found"}, status=404)
+            
+            # Check if review already exists
+            previous_rating = BookReview.objects.filter(book=book, user=user).values_list('rating', flat=True).first()
+            review, created = BookReview.objects.update_or_create(
+                book=book,
+                user=user,
+                defaults={'rating': rating, 'comment': comment}
+            )
+            apply_rating_change(book, previous_rating, rating)
         
         from .serializers import BookReviewSerializer
         serializer = BookReviewSerializer(review)
@@ -827,12 +937,15 @@ class BookReviewDetailView(APIView):
         if not user_id:
             return Response({"error": "user_id required"}, status=400)
         
-        try:
-            review = BookReview.objects.get(book_id=book_id, user_id=user_id)
+        with transaction.atomic():
+            try:
+                book = Book.objects.select_for_update().get(id=book_id)
+                review = BookReview.objects.get(book=book, user_id=user_id)
+            except (Book.DoesNotExist, BookReview.DoesNotExist):
+                return Response({"error": "Review not found"}, status=404)
             review.delete()
-            return Response({"message": "Review deleted successfully"})
-        except BookReview.DoesNotExist:
-            return Response({"error": "Review not found"}, status=404)
+            apply_rating_change(book, review.rating, None)
+        return Response({"message": "Review deleted successfully"})
 
 
 class PoemReviewListView(APIView):
@@ -855,17 +968,28 @@ class PoemReviewListView(APIView):
             return Response({"error": "user_id and rating required"}, status=400)
         
         try:
-            user = AppUser.objects.get(id=user_id)
-            poem = Poem.objects.get(id=poem_id)
-        except (AppUser.DoesNotExist, Poem.DoesNotExist):
-            return Response({"error": "User or Poem not found"}, status=404)
+            rating = int(rating)
+        except (TypeError, ValueError):
+            rating = 0
+        if not 1 <= rating <= 5:
+            return Response({"error": "rating must be between 1 and 5"}, status=400)
         
-        # Check if review already exists
-        review, created = PoemReview.objects.update_or_create(
-            poem=poem,
-            user=user,
-            defaults={'rating': rating, 'comment': comment}
-        )
+        with transaction.atomic():
+            try:
+                user = AppUser.objects.get(id=user_id)
+                # Row lock serializes concurrent reviews while the rating columns change
+                poem = Poem.objects.select_for_update().get(id=poem_id)
+            except (AppUser.DoesNotExist, Poem.DoesNotExist):
+                return Response({"error": "User or Poem not found"}, status=404)
+            
+            # Check if review already exists
+            previous_rating = PoemReview.objects.filter(poem=poem, user=user).values_list('rating', flat=True).first()
+            review, created = PoemReview.objects.update_or_create(
+                poem=poem,
+                user=user,
+                defaults={'rating': rating, 'comment': comment}
+            )
+            apply_rating_change(poem, previous_rating, rating)
         
         from .serializers import PoemReviewSerializer
         serializer = PoemReviewSerializer(review)
@@ -899,181 +1023,199 @@ class PoemReviewDetailView(APIView):
         if not user_id:
             return Response({"error": "user_id required"}, status=400)
         
-        try:
-            review = PoemReview.objects.get(poem_id=poem_id, user_id=user_id)
+        with transaction.atomic():
+            try:
+                poem = Poem.objects.select_for_update().get(id=poem_id)
+                review = PoemReview.objects.get(poem=poem, user_id=user_id)
+            except (Poem.DoesNotExist, PoemReview.DoesNotExist):
+                return Response({"error": "Review not found"}, status=404)
             review.delete()
-            return Response({"message": "Review deleted successfully"})
-        except PoemReview.DoesNotExist:
-            return Response({"error": "Review not found"}, status=404)
+            apply_rating_change(poem, review.rating, None)
+        return Response({"message": "Review deleted successfully"})
+
+
+
+class RatingDistributionView(APIView):
+    """Stored rating summaries (average, count, per-star breakdown) for many books or poems at once"""
+    permission_classes = [AllowAny]
+    MAX_IDS = 100
+    
+    @cached_api_response("books", "poems")
+    def get(self, request):
+        """?type=book|poem&ids=1,2,3"""
+        content_type = request.query_params.get('type')
+        if content_type not in RATING_SOURCES:
+            return Response({"error": f"type must be one of: {', '.join(RATING_SOURCES)}"}, status=400)
+        
+        try:
+            ids = [int(pk) for pk in request.query_params.get('ids', '').split(',') if pk.strip()]
+        except ValueError:
+            return Response({"error": "ids must be comma-separated integers"}, status=400)
+        if not ids:
+            return Response({"error": "ids required"}, status=400)
+        if len(ids) > self.MAX_IDS:
+            return Response({"error": f"At most {self.MAX_IDS} ids per request"}, status=400)
+        
+        rows = CONTENT_MODELS[content_type].objects.filter(pk__in=ids).values(
+            'id', 'average_rating', 'rating_count', *RATING_STAR_FIELDS
+        )
+        return Response({
+            str(row['id']): {
+                "average_rating": row['average_rating'],
+                "review_count": row['rating_count'],
+                "rating_distribution": {str(star): row[f'rating_{star}'] for star in RATING_STARS},
+            }
+            for row in rows
+        })
+
+
+class SearchView(APIView):
+    """Fuzzy search over titles and author names of every content type, best matches first"""
+    permission_classes = [AllowAny]
+    
+    @cached_api_response("books", "poems", "stories", "audiobooks", "videos", "images", "authors", "users")
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({"error": "q is required"}, status=400)
+        
+        # ?types=poem,author restricts the search to those types
+        try:
+            types = parse_search_types(request.query_params.get('types'))
+            offset, size = page_bounds(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        
+        # Deep pages are cut off at SEARCH_MAX_RESULTS so no per-type query reads more than that
+        limit = max(0, min(size, settings.SEARCH_MAX_RESULTS - offset))
+        hits = search_all(text, types, offset, limit + 1) if limit else []
+        has_more = len(hits) > limit and offset + size < settings.SEARCH_MAX_RESULTS
+        next_url = next_page_url(request, offset, size) if has_more else None
+        return paginated_response(hits[:limit], Page(hits[:limit], next_url, None))
 
 
+class AutocompleteView(APIView):
+    """Title and author name completions for a search box prefix, served from memory (no database query)"""
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        try:
+            types = parse_search_types(request.query_params.get('types'))
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        limit = max(1, min(limit, 20))
+        return Response(complete(request.query_params.get('q', ''), limit, types))
+
 
 class UnifiedFeedView(APIView):
     """Get all content types (Books, Poems, Short Stories, Audiobooks, Videos) sorted by creation date - OPTIMIZED with RAW SQL"""
     permission_classes = [AllowAny]
     
     def get(self, request):
-        from django.db import connection
-        
-        # Get pagination parameters
-        limit = int(request.query_params.get('limit', 20))
-        offset = int(request.query_params.get('offset', 0))
+        # Get pagination parameters (limit capped at API_MAX_PAGE_SIZE)
+        try:
+            limit, offset = limit_offset(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
         user_id = request.query_params.get('user_id')  # Optional: to check if user liked
         
-        # Use raw SQL with UNION for maximum performance
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT 'book' as type, b.id, b.title, 
-                       COALESCE(a.name, 'Unknown') as author_name,
-                       a.photo_url as author_photo,
-                       b.cover_image_url as cover_image,
-                       b.description,
-                       CAST(NULL AS TEXT) as content,
-                       b.created_at
-                FROM accounts_book b
-                LEFT JOIN accounts_author a ON b.author_id = a.id
-                WHERE b.is_active IS TRUE
-                
-                UNION ALL
-                
-                SELECT 'poem' as type, p.id, p.title,
-                       COALESCE(a.name, u.username, 'Unknown') as author_name,
-                       COALESCE(a.photo_url, u.profile_photo) as author_photo,
-                       p.background_image_url as cover_image,
-                       p.description,
-                       p.content,
-                       p.created_at
-                FROM accounts_poem p
-                LEFT JOIN accounts_author a ON p.author_id = a.id
-                LEFT JOIN accounts_appuser u ON p.user_id = u.id
-                WHERE p.is_active IS TRUE AND p.is_approved IS TRUE
-                
-                UNION ALL
-                
-                SELECT 'story' as type, s.id, s.title,
-                       COALESCE(a.name, u.username, 'Unknown') as author_name,
-                       COALESCE(a.photo_url, u.profile_photo) as author_photo,
-                       s.cover_image_url as cover_image,
-                       CAST(NULL AS TEXT) as description,
-                       LEFT(s.content, 2000) as content,
-                       s.created_at
-                FROM accounts_shortstory s
-                LEFT JOIN accounts_author a ON s.author_id = a.id
-                LEFT JOIN accounts_appuser u ON s.user_id = u.id
-                WHERE s.is_active IS TRUE AND s.is_approved IS TRUE
-                
-                UNION ALL
-                
-                SELECT 'audiobook' as type, ab.id, ab.title,
-                       COALESCE(a.name, 'Unknown') as author_name,
-                       a.photo_url as author_photo,
-                       ab.cover_image_url as cover_image,
-                       ab.description,
-                       CAST(NULL AS TEXT) as content,
-                       ab.created_at
-                FROM accounts_audiobook ab
-                LEFT JOIN accounts_author a ON ab.author_id = a.id
-                WHERE ab.is_active IS TRUE
-                
-                UNION ALL
-                
-                SELECT 'video' as type, v.id, v.title,
-                       COALESCE(a.name, 'Unknown') as author_name,
-                       a.photo_url as author_photo,
-                       v.thumbnail_url as cover_image,
-                       v.description,
-                       CAST(NULL AS TEXT) as content,
-                       v.created_at
-                FROM accounts_video v
-                LEFT JOIN accounts_author a ON v.author_id = a.id
-                WHERE v.is_active IS TRUE
-                
-                UNION ALL
-                
-                SELECT 'image' as type, i.id, i.title,
-                       COALESCE(a.name, 'Unknown') as author_name,
-                       a.photo_url as author_photo,
-                       i.image_url as cover_image,
-                       i.description,
-                       CAST(NULL AS TEXT) as content,
-                       i.created_at
-                FROM accounts_image i
-                LEFT JOIN accounts_author a ON i.author_id = a.id
-                WHERE i.is_active IS TRUE
-                
-                ORDER BY created_at DESC
-                LIMIT %s OFFSET %s
-            """, [limit, offset])
-            
-            columns = [col[0] for col in cursor.description]
-            results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            
-            # Get total count
-            cursor.execute("""
-                SELECT COUNT(*) FROM (
-                    SELECT id FROM accounts_book WHERE is_active IS TRUE
-                    UNION ALL
-                    SELECT id FROM accounts_poem WHERE is_active IS TRUE AND is_approved IS TRUE
-                    UNION ALL
-                    SELECT id FROM accounts_shortstory WHERE is_active IS TRUE AND is_approved IS TRUE
-                    UNION ALL
-                    SELECT id FROM accounts_audiobook WHERE is_active IS TRUE
-                    UNION ALL
-                    SELECT id FROM accounts_video WHERE is_active IS TRUE
-                    UNION ALL
-                    SELECT id FROM accounts_image WHERE is_active IS TRUE
-                ) as total
-            """)
-            total = cursor.fetchone()[0]
-        
-        # Add like and comment counts for each item
+        # Content type filter: ?types=poem,story only queries (and counts) those tables
+        try:
+            types = parse_feed_types(request.query_params.get('types'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        
+        # Delta sync: ?since=<ISO timestamp|sync token> returns only changes plus tombstones
+        since = request.query_params.get('since')
+        if since:
+            try:
+                position = parse_since(since)
+            except InvalidCursor as e:
+                return Response({"error": str(e)}, status=400)
+            return self.get_changes(since, position, limit, types, user_id)
+        
+        # Keyset mode: ?cursor=<next token> (empty for the first page) instead of offset
+        cursor = None
+        token = request.query_params.get('cursor')
+        if token:
+            try:
+                cursor = decode_cursor(token)
+            except InvalidCursor as e:
+                return Response({"error": str(e)}, status=400)
+        
+        # Exact total is optional (?count=false or FEED_EXACT_COUNT=False); has_more is always set
+        include_total = settings.FEED_EXACT_COUNT and request.query_params.get('count', 'true').lower() != 'false'
+        
+        # Fetch the page with the configured engine (raw SQL UNION or materialized FeedItem table).
+        # One extra row tells us whether another page exists.
+        results = fetch_feed_page(limit + 1, offset, cursor, types=types)
+        has_more = len(results) > limit
+        results = results[:limit]
+        total = count_feed_items(types) if include_total else None
+        next_cursor = encode_cursor(results[-1]) if has_more and results else None
+        
+        # Add like/comment counts and user flags for the whole page in grouped queries
+        enrich_feed_items(results, user_id)
+        
+        # Convert datetime objects to ISO format
         for item in results:
-            # Get like count
-            like_count = Like.objects.filter(
-                content_type=item['type'],
-                content_id=item['id']
-            ).count()
-            item['like_count'] = like_count
-            
-            # Check if current user liked this
-            item['user_liked'] = False
-            if user_id:
-                item['user_liked'] = Like.objects.filter(
-                    content_type=item['type'],
-                    content_id=item['id'],
-                    user_id=user_id
-                ).exists()
-            
-            # Check if current user saved this
-            item['user_saved'] = False
-            if user_id:
-                item['user_saved'] = Bookmark.objects.filter(
-                    content_type=item['type'],
-                    content_id=item['id'],
-                    user_id=user_id
-                ).exists()
-            
-            # Get comment count
-            comment_count = Comment.objects.filter(
-                content_type=item['type'],
-                content_id=item['id']
-            ).count()
-            item['comment_count'] = comment_count
-            
-            # Convert datetime objects to ISO format
             if item['created_at']:
                 item['created_at'] = item['created_at'].isoformat()
         
         return Response({
             'total': total,
+            'has_more': has_more,
+            'next': next_cursor,
             'items': results
         })
+    
+    def get_changes(self, since, position, limit, types, user_id):
+        """Items created/changed after `position`, and tombstones for hidden or deleted ones"""
+        resent, changes, has_more = fetch_feed_changes(position, limit, types)
+        # Clients store `next` and send it back as ?since= on the next sync
+        next_token = encode_sync_token(changes[-1]) if changes else since
+        
+        items = []
+        deleted = []
+        for change in resent + changes:
+            is_visible = change.pop('is_visible')
+            change.pop('updated_at')
+            if is_visible:
+                items.append(change)
+            else:
+                deleted.append({'type': change['type'], 'id': change['id']})
+        
+        enrich_feed_items(items, user_id)
+        for item in items:
+            if item['created_at']:
+                item['created_at'] = item['created_at'].isoformat()
+        
+        return Response({
+            'has_more': has_more,
+            'next': next_token,
+            'items': items,
+            'deleted': deleted
+        })
+
+
+class AuthorWorksView(APIView):
+    """Per-type counts and the first page of every content type of one author, for the author page"""
+    permission_classes = [AllowAny]
+    
+    @cached_api_response("authors", "users", "categories", "books", "poems", "stories", "audiobooks", "videos", "images")
+    def get(self, request, pk):
+        works = author_works(pk, page_size(request.query_params, settings.AUTHOR_WORKS_PAGE_SIZE))
+        if works is None:
+            return Response({"error": "Author not found"}, status=404)
+        return Response(works)
 
 
 class AuthorDetailUpdateView(APIView):
     """Get and update author details"""
     permission_classes = [AllowAny]
     
+    @cached_api_response("authors")
     def get(self, request, pk):
         try:
             author = Author.objects.get(pk=pk)
@@ -1113,10 +1255,11 @@ class AuthorDetailUpdateView(APIView):
 class ShortStoryListView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("stories", "authors", "users")
     def get(self, request):
         """Get all active short stories"""
         from .serializers import ShortStorySerializer
-        stories = ShortStory.objects.filter(is_active=True, is_approved=True)
+        stories = ShortStory.objects.for_api().filter(is_active=True, is_approved=True)
         
         # Filter by genre
         genre = request.query_params.get('genre')
@@ -1128,8 +1271,21 @@ class ShortStoryListView(APIView):
         if author_id:
             stories = stories.filter(author_id=author_id)
         
-        serializer = ShortStorySerializer(stories, many=True)
-        return Response(serializer.data)
+        # Full-text search, best matches first
+        search = request.query_params.get('search')
+        if search:
+            stories = search_queryset(stories, search)
+        
+        fields, error = select_fields(request.query_params, ShortStorySerializer)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        page, error = paginate(request, project(stories, ShortStorySerializer, fields))
+        if error:
+            return Response({"error": error}, status=400)
+        
+        serializer = ShortStorySerializer(page.items, many=True, fields=fields)
+        return paginated_response(serializer.data, page)
     
     def post(self, request):
         """Create new short story (admin only)"""
@@ -1155,11 +1311,12 @@ class ShortStoryListView(APIView):
 class ShortStoryDetailView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("stories", "authors", "users")
     def get(self, request, pk):
         """Get single short story"""
         try:
             from .serializers import ShortStorySerializer
-            story = ShortStory.objects.get(pk=pk, is_active=True)
+            story = ShortStory.objects.for_api().get(pk=pk, is_active=True)
             serializer = ShortStorySerializer(story)
             return Response(serializer.data)
         except ShortStory.DoesNotExist:
@@ -1218,10 +1375,11 @@ class ShortStoryDetailView(APIView):
 class AudiobookListView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("audiobooks", "authors")
     def get(self, request):
         """Get all active audiobooks"""
         from .serializers import AudiobookSerializer
-        audiobooks = Audiobook.objects.filter(is_active=True)
+        audiobooks = Audiobook.objects.for_api().filter(is_active=True)
         
         # Filter by genre
         genre = request.query_params.get('genre')
@@ -1233,8 +1391,16 @@ class AudiobookListView(APIView):
         if author_id:
             audiobooks = audiobooks.filter(author_id=author_id)
         
-        serializer = AudiobookSerializer(audiobooks, many=True)
-        return Response(serializer.data)
+        fields, error = select_fields(request.query_params, AudiobookSerializer)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        page, error = paginate(request, project(audiobooks, AudiobookSerializer, fields))
+        if error:
+            return Response({"error": error}, status=400)
+        
+        serializer = AudiobookSerializer(page.items, many=True, fields=fields)
+        return paginated_response(serializer.data, page)
     
     def post(self, request):
         """Create new audiobook (admin only)"""
@@ -1260,11 +1426,12 @@ class AudiobookListView(APIView):
 class AudiobookDetailView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("audiobooks", "authors")
     def get(self, request, pk):
         """Get single audiobook"""
         try:
             from .serializers import AudiobookSerializer
-            audiobook = Audiobook.objects.get(pk=pk, is_active=True)
+            audiobook = Audiobook.objects.for_api().get(pk=pk, is_active=True)
             serializer = AudiobookSerializer(audiobook)
             return Response(serializer.data)
         except Audiobook.DoesNotExist:
@@ -1323,10 +1490,11 @@ class AudiobookDetailView(APIView):
 class VideoListView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("videos", "authors")
     def get(self, request):
         """Get all active videos"""
         from .serializers import VideoSerializer
-        videos = Video.objects.filter(is_active=True)
+        videos = Video.objects.for_api().filter(is_active=True)
         
         # Filter by category
         category = request.query_params.get('category')
@@ -1338,8 +1506,16 @@ class VideoListView(APIView):
         if author_id:
             videos = videos.filter(author_id=author_id)
         
-        serializer = VideoSerializer(videos, many=True)
-        return Response(serializer.data)
+        fields, error = select_fields(request.query_params, VideoSerializer)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        page, error = paginate(request, project(videos, VideoSerializer, fields))
+        if error:
+            return Response({"error": error}, status=400)
+        
+        serializer = VideoSerializer(page.items, many=True, fields=fields)
+        return paginated_response(serializer.data, page)
     
     def post(self, request):
         """Create new video (admin only)"""
@@ -1365,11 +1541,12 @@ class VideoListView(APIView):
 class VideoDetailView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("videos", "authors")
     def get(self, request, pk):
         """Get single video"""
         try:
             from .serializers import VideoSerializer
-            video = Video.objects.get(pk=pk, is_active=True)
+            video = Video.objects.for_api().get(pk=pk, is_active=True)
             serializer = VideoSerializer(video)
             return Response(serializer.data)
         except Video.DoesNotExist:
@@ -1429,10 +1606,11 @@ class VideoDetailView(APIView):
 class ImageListView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("images", "authors")
     def get(self, request):
         """Get all active images"""
         from .serializers import ImageSerializer
-        images = Image.objects.filter(is_active=True)
+        images = Image.objects.for_api().filter(is_active=True)
         
         # Filter by category
         category = request.query_params.get('category')
@@ -1444,8 +1622,16 @@ class ImageListView(APIView):
         if author_id:
             images = images.filter(author_id=author_id)
         
-        serializer = ImageSerializer(images, many=True)
-        return Response(serializer.data)
+        fields, error = select_fields(request.query_params, ImageSerializer)
+        if error:
+            return Response({"error": error}, status=400)
+        
+        page, error = paginate(request, project(images, ImageSerializer, fields))
+        if error:
+            return Response({"error": error}, status=400)
+        
+        serializer = ImageSerializer(page.items, many=True, fields=fields)
+        return paginated_response(serializer.data, page)
     
     def post(self, request):
         """Create new image (admin only)"""
@@ -1471,11 +1657,12 @@ class ImageListView(APIView):
 class ImageDetailView(APIView):
     permission_classes = [AllowAny]
     
+    @cached_api_response("images", "authors")
     def get(self, request, pk):
         """Get single image"""
         try:
             from .serializers import ImageSerializer
-            image = Image.objects.get(pk=pk, is_active=True)
+            image = Image.objects.for_api().get(pk=pk, is_active=True)
             serializer = ImageSerializer(image)
             return Response(serializer.data)
         except Image.DoesNotExist:
@@ -1562,18 +1749,24 @@ class LikeToggleView(APIView):
         
         if existing_like:
             # Unlike
-            existing_like.delete()
+            with transaction.atomic():
+                existing_like.delete()
+                adjust_counter(content_type, content_id, 'like_count', -1)
+            record_like(user.id, content_type, content_id, False)
             return Response({
                 "message": "Unliked successfully",
                 "liked": False
             }, status=status.HTTP_200_OK)
         else:
             # Like
-            like = Like.objects.create(
-                user=user,
-                content_type=content_type,
-                content_id=content_id
-            )
+            with transaction.atomic():
+                like = Like.objects.create(
+                    user=user,
+                    content_type=content_type,
+                    content_id=content_id
+                )
+                adjust_counter(content_type, content_id, 'like_count', 1)
+            record_like(user.id, content_type, content_id, True)
             serializer = LikeSerializer(like)
             return Response({
                 "message": "Liked successfully",
@@ -1598,19 +1791,25 @@ class LikeListView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        likes = Like.objects.filter(
+        likes = Like.objects.for_api().filter(
             content_type=content_type,
             content_id=content_id
         )
         
-        # Check if current user liked this content
+        # Check if current user liked this content (cached per-user set, see accounts.personalization)
         user_liked = False
         if user_id:
-            user_liked = likes.filter(user_id=user_id).exists()
+            key = (content_type, int(content_id))
+            user_liked = key in find_user_likes(user_id, [key])
+        
+        page, error = paginate(request, likes, exact_total=True)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = LikeSerializer(likes, many=True)
+        serializer = LikeSerializer(page.items, many=True)
         return Response({
-            "count": likes.count(),
+            "count": page.total,
+            "next": page.next,
             "user_liked": user_liked,
             "likes": serializer.data
         }, status=status.HTTP_200_OK)
@@ -1631,14 +1830,19 @@ class CommentListView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        comments = Comment.objects.filter(
+        comments = Comment.objects.for_api().filter(
             content_type=content_type,
             content_id=content_id
         ).order_by('-created_at')
         
-        serializer = CommentSerializer(comments, many=True)
+        page, error = paginate(request, comments, exact_total=True)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = CommentSerializer(page.items, many=True)
         return Response({
-            "count": comments.count(),
+            "count": page.total,
+            "next": page.next,
             "comments": serializer.data
         }, status=status.HTTP_200_OK)
     
@@ -1660,12 +1864,14 @@ class CommentListView(APIView):
         except AppUser.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        comment = Comment.objects.create(
-            user=user,
-            content_type=content_type,
-            content_id=content_id,
-            text=text
-        )
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                user=user,
+                content_type=content_type,
+                content_id=content_id,
+                text=text
+            )
+            adjust_counter(content_type, content_id, 'comment_count', 1)
         
         serializer = CommentSerializer(comment)
         return Response({
@@ -1736,7 +1942,9 @@ class CommentDetailView(APIView):
         except AppUser.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        comment.delete()
+        with transaction.atomic():
+            comment.delete()
+            adjust_counter(comment.content_type, comment.content_id, 'comment_count', -1)
         return Response(
             {"message": "Comment deleted successfully"},
             status=status.HTTP_200_OK
@@ -1782,6 +1990,7 @@ class BookmarkToggleView(APIView):
         if existing:
             # Unsave
             existing.delete()
+            record_bookmark(user.id, content_type, content_id, False)
             return Response({
                 "message": "Removed from saved",
                 "saved": False
@@ -1793,6 +2002,7 @@ class BookmarkToggleView(APIView):
                 content_type=content_type,
                 content_id=content_id
             )
+            record_bookmark(user.id, content_type, content_id, True)
             serializer = BookmarkSerializer(bookmark)
             return Response({
                 "message": "Saved successfully",
@@ -1820,14 +2030,19 @@ class BookmarkListView(APIView):
         except AppUser.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        bookmarks = Bookmark.objects.filter(user=user)
+        bookmarks = Bookmark.objects.for_api().filter(user=user)
         
         if content_type:
             bookmarks = bookmarks.filter(content_type=content_type)
         
-        serializer = BookmarkSerializer(bookmarks, many=True)
+        page, error = paginate(request, bookmarks, exact_total=True)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = BookmarkSerializer(page.items, many=True)
         return Response({
-            "count": bookmarks.count(),
+            "count": page.total,
+            "next": page.next,
             "bookmarks": serializer.data
         }, status=status.HTTP_200_OK)
 
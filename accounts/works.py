@@ -0,0 +1,66 @@
+"""
+Author page behind /api/authors/<id>/works/: how many items of each content
+type an author has, plus the first page of each, in a fixed number of
+queries: one for the author with every count as a subquery, then one per type
+that has items. All of them filter and sort on the type's
+(author, is_active, -created_at) index. Visibility matches each type's list
+endpoint with ?author=, so the counts agree with paging through those.
+"""
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .fastpath import DERIVED_FIELDS, render_rows, values_queryset
+from .models import Audiobook, Author, Book, Image, Poem, ShortStory, Video
+from .serializers import (
+    AudiobookSerializer, AuthorSerializer, BookSerializer, ImageSerializer, PoemSerializer,
+    ShortStorySerializer, VideoSerializer, project, select_fields,
+)
+
+# type (as in CONTENT_MODELS) -> (model, list serializer, visibility filter of its list endpoint)
+WORK_TYPES = {
+    'book': (Book, BookSerializer, {'is_active': True}),
+    'poem': (Poem, PoemSerializer, {'is_active': True}),
+    'story': (ShortStory, ShortStorySerializer, {'is_active': True, 'is_approved': True}),
+    'audiobook': (Audiobook, AudiobookSerializer, {'is_active': True}),
+    'video': (Video, VideoSerializer, {'is_active': True}),
+    'image': (Image, ImageSerializer, {'is_active': True}),
+}
+
+
+def _count(model, visible):
+    """Number of the outer author's visible rows of `model`"""
+    rows = (
+        model.objects.filter(author=OuterRef('pk'), **visible).order_by()
+        .values('author').annotate(count=Count('pk')).values('count')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def _first_page(work_type, author_id, size):
+    """The author's `size` newest rows of one type, rendered like its list endpoint's cards"""
+    model, serializer_class, visible = WORK_TYPES[work_type]
+    queryset = model.objects.for_api().filter(author_id=author_id, **visible).order_by('-created_at', '-pk')
+    fields, _ = select_fields({}, serializer_class)
+    if settings.API_FAST_LISTS and serializer_class in DERIVED_FIELDS:
+        rows = values_queryset(queryset, serializer_class, fields)[:size]
+        return render_rows(rows, serializer_class, fields)
+    items = project(queryset, serializer_class, fields)[:size]
+    return serializer_class(items, many=True, fields=fields).data
+
+
+def author_works(author_id, size):
+    """{author, counts, works} for an author page, or None for an unknown author"""
+    counts = {f'{work_type}_count': _count(model, visible) for work_type, (model, _, visible) in WORK_TYPES.items()}
+    author = Author.objects.filter(pk=author_id).annotate(**counts).first()
+    if author is None:
+        return None
+    counts = {work_type: getattr(author, f'{work_type}_count') for work_type in WORK_TYPES}
+    return {
+        'author': AuthorSerializer(author).data,
+        'counts': counts,
+        'works': {
+            work_type: _first_page(work_type, author_id, size) if count else []
+            for work_type, count in counts.items()
+        },
+    }
@@ -10,7 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 from pathlib import Path
+import atexit
 import os
+import shutil
+import sys
+import tempfile
 from dotenv import load_dotenv
 import cloudinary
 import dj_database_url
@@ -19,6 +23,9 @@ load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# `manage.py test` must not share cache or index files with a dev server on the same machine
+TESTING = sys.argv[1:2] == ['test']
+
 # Cloudinary Configuration
 cloudinary.config(
     cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
@@ -60,6 +67,20 @@ REST_FRAMEWORK = {
     ),
 }
 
+# 'orjson' renders and parses API JSON with orjson (stdlib fallback when it is not
+# installed, see accounts.renderers); 'json' keeps DRF's default classes
+API_JSON_BACKEND = os.getenv('API_JSON_BACKEND', 'orjson')
+if API_JSON_BACKEND == 'orjson':
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
+        "accounts.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    )
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"] = (
+        "accounts.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    )
+
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -75,11 +96,14 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
     'x-user-id',  # Custom header for user authentication
 ] 
+# Pagination headers of list endpoints (see accounts.pagination)
+CORS_EXPOSE_HEADERS = ['link', 'x-total-count']
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
 
     'django.middleware.security.SecurityMiddleware',
+    'accounts.middleware.CompressionMiddleware',  # gzip/brotli for large responses
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files on Render
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -89,6 +113,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Responses smaller than this many bytes are sent uncompressed (see accounts.middleware)
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -142,6 +169,62 @@ else:
     }
 
 
+# Cache
+# CACHE_BACKEND: 'file' (shared by the gunicorn workers of one machine), 'redis' (shared by
+# all machines; needs the `redis` package and REDIS_URL) or 'locmem' (per process: the
+# response, feed count and liked/saved set caches are then bypassed, see accounts.cache)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'file')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_DIR", "/tmp/mimanasa-cache"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "mimanasa",
+        }
+    }
+
+if TESTING:
+    # A file cache of its own per run (locmem would bypass the response cache under test)
+    TEST_CACHE_DIR = tempfile.mkdtemp(prefix='mimanasa-test-cache-')
+    atexit.register(shutil.rmtree, TEST_CACHE_DIR, ignore_errors=True)
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": TEST_CACHE_DIR,
+        }
+    }
+
+# Seconds a cached public GET response lives (entries are also invalidated on writes)
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+
+# Seconds clients and CDNs may reuse /api/meta/ before revalidating it with its ETag
+META_CACHE_MAX_AGE = int(os.getenv('META_CACHE_MAX_AGE', 86400))
+# Seconds a worker serves its in-process /api/meta/ body before re-reading the categories
+META_BUNDLE_TTL = int(os.getenv('META_BUNDLE_TTL', 60))
+
+# List endpoints: default and hard maximum rows per page (see accounts.pagination)
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 100))
+# Render book/poem lists from .values() rows instead of DRF serializers (see accounts.fastpath)
+API_FAST_LISTS = os.getenv('API_FAST_LISTS', 'True') == 'True'
+# /api/authors/<id>/works/: rows of each content type on the first page (?page_size= overrides)
+AUTHOR_WORKS_PAGE_SIZE = int(os.getenv('AUTHOR_WORKS_PAGE_SIZE', 10))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -191,6 +274,33 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@mimanasa.com')
 
+# Unified feed engine: 'sql' (UNION over the content tables), 'merge' (per-type top-N queries
+# merged in Python) or 'materialized' (FeedItem table).
+# Run `python manage.py rebuild_feed_items` once before switching to 'materialized'.
+FEED_ENGINE = os.getenv('FEED_ENGINE', 'sql')
+# Set to False to skip the feed total entirely (clients page with has_more/next only)
+FEED_EXACT_COUNT = os.getenv('FEED_EXACT_COUNT', 'True') == 'True'
+# ?since= re-sends the feed changes of this many seconds before the sync token, so a write whose
+# transaction committed after a client synced past its updated_at is still delivered
+FEED_SYNC_OVERLAP = int(os.getenv('FEED_SYNC_OVERLAP', 60))
+
+# ?search= engine: 'postgres' (tsvector + GIN, PostgreSQL only), 'inverted' (in-process BM25
+# index, see accounts.search.inverted) or 'auto' (postgres on PostgreSQL, inverted elsewhere)
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+# File the inverted index is memory-mapped from and shared through by all workers of a
+# machine (changes go to <path>.journal next to it); empty keeps it in memory per process.
+# Built on first use, or up front with `manage.py build_search_index`.
+SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', '/tmp/mimanasa-search.idx')
+# Same for the /api/autocomplete/ prefix index (see accounts.search.autocomplete)
+AUTOCOMPLETE_INDEX_PATH = os.getenv('AUTOCOMPLETE_INDEX_PATH', '/tmp/mimanasa-autocomplete.idx')
+if TESTING:
+    # Per-process indexes; tests of the shared files point these at temporary directories
+    SEARCH_INDEX_PATH = AUTOCOMPLETE_INDEX_PATH = ''
+# /api/search/: minimum pg_trgm word similarity (0-1) for a title to match; lower tolerates more typos
+SEARCH_TRIGRAM_THRESHOLD = float(os.getenv('SEARCH_TRIGRAM_THRESHOLD', 0.4))
+# Deepest result /api/search/ pages into (each type's query reads at most this many rows)
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 500))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 